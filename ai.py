@@ -1,21 +1,68 @@
-import ollama
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy import select, result_tuple
 from crud import CRUD
-from db_config import Users, Tables, Columns, Data, Base
-from typing import Dict, Any, List
-
-engine = create_async_engine("sqlite+aiosqlite:///./test.db", echo=False)
-async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+from db_config import Users, Tables, Columns, Data, async_session_maker
+from typing import Dict, Any, List, Tuple, Callable, Awaitable, Optional
+import asyncio
+from llm import LLMPool
+from schema_cache import SchemaCache
+from fast_path import FastPath
+from result_cache import ResultCache
+from tool_registry import ToolRegistry
+from model_router import ModelRouter
+from planner import PLAN_PROMPT, PlanError, PlanExecutor, parse_plan
+from memory import MemoryManager
+from context_store import ContextStore
+from formatter import pager
+from streaming import ThinkFilter, strip_think
+import config
+
+READ_ONLY_TOOLS = {
+    "tables_get", "columns_get", "data_get", "list_records", "list_records_with_filters",
+    "data_search", "table_read", "data_aggregate", "next_page",
+}
+SCHEMA_TOOLS = {
+    "tables_create", "tables_update", "tables_delete",
+    "columns_create", "columns_update", "columns_delete",
+}
 
 
 class AIHandler:
-    # ai = ollama.Client('26.91.15.215:11434')
-    # model = 'qwen3:14b'
-    ai = ollama.Client('127.0.0.1:11434')
-    model = 'qwen3'
+    ai = LLMPool()
+    model = config.OLLAMA_MODEL
+    list_limit = 100
+    group_limit = 50
+    report_prompt = (
+        "Тебе необходимо составить отчёт по выполнению задания пользователя. Вся информация о выполнении также "
+        "будет указана в автоматизированных запросах пользователя. Нужно указывать только итоговый результат "
+        "операций. Итоговый результат находится под указателем user. Отвечай на изначальный запрос пользователя. "
+        "Если требуемый результат не был достигнут, так и пиши! Врать нельзя. Также можешь попросить уточнить "
+        "запрос. Если была найдена какая-то ошибка - укажи её. Если же пользователь попросил получить какие-то "
+        "данные и дополнительно обработать их - твой ответ должен не ограничиваться отчётом. Нужно выполнить "
+        "форматирование в требуемом виде."
+    )
+    loop_prompt = (
+        "Ты - помощник в управлении таблицами и базой данных. Тебе нужно использовать доступные инструменты "
+        "(Functions/Tools) для решения задач пользователя. Если требуется выполнить действие: поиск, создание, "
+        "удаление, редактирование — ОБЯЗАТЕЛЬНО используй tools. Не выводи обычный текст в ответах, только вызовы "
+        "функций. При работе с идентификаторами и данными используй только те значения, которые были получены "
+        "через функции или указаны пользователем. Если нужной информации нет, но она необходима для выполнения "
+        "задачи - используй функции поиска. Если задача выполнена - используй tool под названием task_end. При "
+        "создании таблицы НИКОГДА не добавляй столбцы в одной итерации. Отправь выполнение функции на создание "
+        "таблицы, а в следующей итерации выполняй действия с полученным id. Завершение задачи должно выполняться"
+        " через task_end. Если функция вернула что-то кроме 'Не найдено' - действие выполнено и повторно его "
+        "выполнять не требуется. Если больше задач нет и все действия выполнены - используй task_end. "
+        "Список таблиц и колонок пользователя с их id приведён в следующем системном сообщении, а после "
+        "изменений обновлённый список приходит вместе с выводом функций - не ищи эти id через list_records."
+    )
 
     def __init__(self):
+        self.schema_cache = SchemaCache()
+        self.fast_path = FastPath(self.schema_cache)
+        self.result_cache = ResultCache()
+        self.write_calls: Dict[int, int] = {}
+        self.tool_semaphore = asyncio.Semaphore(config.TOOL_CONCURRENCY)
+        self.contexts = ContextStore(async_session_maker)
+        self.router = ModelRouter(AIHandler.model)
+        self.memory = MemoryManager(AIHandler.ai, self.router.small, self._get_user_context, self._set_user_context)
         self.tools = [
             {
                 "type": "function",
@@ -150,6 +197,29 @@ class AIHandler:
                     }
                 }
             },
+            {
+                "type": "function",
+                "function": {
+                    "name": "rows_insert",
+                    "description": "Добавляет сразу много строк в таблицу одним вызовом. Номера строк (row_id) "
+                                   "назначаются автоматически. Каждая строка - объект вида "
+                                   "{ 'Название колонки': 'значение' }. Используй вместо множества вызовов data_create. "
+                                   "Пример: { 'table_id': 1, 'rows': [ { 'Имя': 'Влад', 'Возраст': '25' }, "
+                                   "{ 'Имя': 'Анна', 'Возраст': '30' } ] }",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "table_id": {"type": "integer", "description": "ID таблицы"},
+                            "rows": {
+                                "type": "array",
+                                "description": "Список строк, каждая строка - объект { название колонки: значение }",
+                                "items": {"type": "object"}
+                            }
+                        },
+                        "required": ["table_id", "rows"]
+                    }
+                }
+            },
             {
                 "type": "function",
                 "function": {
@@ -222,7 +292,8 @@ class AIHandler:
                                    "- 'like': частичное совпадение строки\n"
                                    "- 'eq': точное равенство значения\n"
                                    "- 'gt': значение больше заданного\n"
-                                   "- 'lt': значение меньше заданного\n"
+                                   "- 'lt': значение меньше заданного (для числовых колонок и дат сравнение "
+                                   "выполняется как для чисел и дат)\n"
                                    "Примеры:\n"
                                    "1. Поиск всех колонок с названием 'Имя' в таблице с ID 1: "
                                    "{ 'model': 'Columns', 'filters': { 'table_id': { 'eq': 1 }, 'column_name': { 'like': 'Имя' } } }\n"
@@ -240,12 +311,92 @@ class AIHandler:
                             "filters": {
                                 "type": "object",
                                 "description": "Фильтры для выборки данных. Поддерживаются операторы: like, eq, gt, lt. Пример: { 'column_name': { 'like': 'Имя' }, 'table_id': { 'eq': 1 } }"
-                            }
+                            },
+                            "limit": {"type": "integer", "description": "Максимальное количество записей (по умолчанию 100)"},
+                            "offset": {"type": "integer", "description": "Сколько записей пропустить (для следующей страницы)"},
+                            "order_by": {"type": "string", "description": "Поле для сортировки, '-' в начале - по убыванию. Например: '-data'"}
                         },
                         "required": ["model", "filters"]
                     }
                 }
             },
+            {
+                "type": "function",
+                "function": {
+                    "name": "table_read",
+                    "description": "Возвращает строки таблицы целиком: для каждой строки row_id и значения всех "
+                                   "(или только указанных) колонок. Используй для просмотра содержимого таблицы "
+                                   "вместо множества вызовов data_get. Поддерживает постраничный вывод.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "table_id": {"type": "integer", "description": "ID таблицы"},
+                            "columns": {
+                                "type": "array",
+                                "description": "Названия колонок для вывода (по умолчанию все)",
+                                "items": {"type": "string"}
+                            },
+                            "limit": {"type": "integer", "description": "Количество строк (по умолчанию 50)"},
+                            "offset": {"type": "integer", "description": "Сколько строк пропустить"}
+                        },
+                        "required": ["table_id"]
+                    }
+                }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "data_search",
+                    "description": "Полнотекстовый поиск по значениям ячеек во всех таблицах пользователя. "
+                                   "Возвращает найденные совпадения, отсортированные по релевантности, с "
+                                   "координатами: таблица, колонка, номер строки и фрагмент текста. "
+                                   "Используй для поиска данных вместо перебора записей.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "query": {"type": "string", "description": "Слова для поиска"},
+                            "table_id": {"type": "integer", "description": "ID таблицы для ограничения поиска"},
+                            "limit": {"type": "integer", "description": "Максимальное количество результатов (по умолчанию 20)"}
+                        },
+                        "required": ["query"]
+                    }
+                }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "data_aggregate",
+                    "description": "Считает итог по колонке прямо в базе данных: количество (count), сумму (sum), "
+                                   "среднее (avg), минимум (min) или максимум (max). Можно сгруппировать результат "
+                                   "по значениям другой колонки той же таблицы. Используй для любых подсчётов "
+                                   "вместо получения всех записей. Пример: сумма колонки 7 по значениям колонки 5: "
+                                   "{ 'column_id': 7, 'function': 'sum', 'group_by_column_id': 5 }",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "column_id": {"type": "integer", "description": "ID колонки для подсчёта"},
+                            "function": {"type": "string", "description": "count, sum, avg, min или max"},
+                            "group_by_column_id": {"type": "integer", "description": "ID колонки для группировки"}
+                        },
+                        "required": ["column_id", "function"]
+                    }
+                }
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "next_page",
+                    "description": "Возвращает следующую страницу длинного результата. Используй, когда в выводе "
+                                   "функции указано 'Для продолжения вызови next_page с cursor=...'.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "cursor": {"type": "string", "description": "Курсор из предыдущего результата"}
+                        },
+                        "required": ["cursor"]
+                    }
+                }
+            },
             {
                 "type": "function",
                 "function": {
@@ -264,117 +415,117 @@ class AIHandler:
                 }
             }
         ]
+        self.registry = ToolRegistry()
+        for schema in self.tools:
+            name = schema["function"]["name"]
+            self.registry.register(schema, getattr(self, f"_{name}"), final=name == "task_end")
 
-    async def handle_query(self, query: str, user_id: int) -> str:
+    async def warm_up(self):
+        await AIHandler.ai.warm_up(dict.fromkeys([self.router.large, self.router.small]))
+
+    async def handle_query(self, query: str, user_id: int, mode: str = None,
+                           on_text: Optional[Callable[[str], Awaitable[None]]] = None) -> str:
         try:
-            response = await self._call_ollama(query, user_id)
+            if mode != "plan":
+                answer = await self.fast_path.answer(query, user_id)
+                if answer is not None:
+                    await self._remember(user_id, {"role": "user", "content": query},
+                                         {"role": "assistant", "content": answer})
+                    return answer
+            if (mode or config.AGENT_MODE) == "plan":
+                response = await self._call_ollama_plan(query, user_id, on_text)
+            else:
+                context = await self._get_user_context(user_id)
+                key = self.result_cache.key(query, user_id, context)
+                response = self.result_cache.get(key)
+                if response is not None:
+                    await self._remember(user_id, {"role": "user", "content": query},
+                                         {"role": "assistant", "content": response})
+                    return response
+                writes = self.write_calls.get(user_id, 0)
+                response = await self._call_ollama(query, user_id, on_text)
+                if (self.write_calls.get(user_id, 0) == writes and self.result_cache.key(query, user_id, context) == key
+                        and not self.registry.unmatched_verbs(query)):
+                    self.result_cache.set(key, response)
             return response
         except Exception as e:
             return f"Ошибка: {str(e)}"
 
-    @staticmethod
-    async def _get_user_context(user_id: int) -> dict:
-        async with async_session_maker() as session:
-            stmt = select(Users).where(Users.id == user_id)
-            result = await session.execute(stmt)
-            user = result.scalars().first()
-            return user.context if user and user.context else {}
+    async def _remember(self, user_id: int, *messages: Dict) -> dict:
+        # Always re-read: a summary may have been stored while the turn was running.
+        context = await self._get_user_context(user_id)
+        for message in messages:
+            context = self.memory.add(context, message)
+        await self._set_user_context(user_id, context)
+        return context
 
-    @staticmethod
-    async def _set_user_context(user_id: int, context: dict):
-        async with async_session_maker() as session:
-            stmt = select(Users).where(Users.id == user_id)
-            result = await session.execute(stmt)
-            user = result.scalars().first()
+    async def _get_user_context(self, user_id: int) -> dict:
+        return await self.contexts.get(user_id)
 
-            if user:
-                user.context = context
-            else:
-                session.add(Users(id=user_id, context=context))
-            await session.commit()
+    async def _set_user_context(self, user_id: int, context: dict):
+        await self.contexts.set(user_id, context)
 
     async def _tools_calling(self, function_name, user_id, arguments):
-        repeat = True
-        if function_name == "tables_create":
-            result = await self._tables_create(arguments, user_id)
-        elif function_name == "tables_get":
-            result = await self._tables_get(arguments, user_id)
-        elif function_name == "tables_update":
-            result = await self._tables_update(arguments, user_id)
-        elif function_name == "tables_delete":
-            result = await self._tables_delete(arguments, user_id)
-        elif function_name == "columns_create":
-            result = await self._columns_create(arguments, user_id)
-        elif function_name == "columns_get":
-            result = await self._columns_get(arguments, user_id)
-        elif function_name == "columns_update":
-            result = await self._columns_update(arguments, user_id)
-        elif function_name == "columns_delete":
-            result = await self._columns_delete(arguments, user_id)
-        elif function_name == "data_create":
-            result = await self._data_create(arguments, user_id)
-        elif function_name == "data_get":
-            result = await self._data_get(arguments, user_id)
-        elif function_name == "data_update":
-            result = await self._data_update(arguments, user_id)
-        elif function_name == "data_delete":
-            result = await self._data_delete(arguments, user_id)
-        elif function_name == "list_records":
-            result = await self._list_records(arguments, user_id)
-        elif function_name == "list_records_with_filters":
-            result = await self._list_records_with_filters(arguments, user_id)
-        elif function_name == "task_end":
-            repeat = False
-            result = "Задача завершена."
-        else:
-            result = "Неизвестная функция."
-        return repeat, result
-
-
-    async def _call_ollama(self, query: str, user_id: int) -> str:
-        system_prompt = (
-            "Ты - помощник в управлении таблицами и базой данных. Тебе нужно использовать доступные инструменты "
-            "(Functions/Tools) для решения задач пользователя. Если требуется выполнить действие: поиск, создание, "
-            "удаление, редактирование — ОБЯЗАТЕЛЬНО используй tools. Не выводи обычный текст в ответах, только вызовы "
-            "функций. При работе с идентификаторами и данными используй только те значения, которые были получены "
-            "через функции или указаны пользователем. Если нужной информации нет, но она необходима для выполнения "
-            "задачи - используй функции поиска. Если задача выполнена - используй tool под названием task_end. При "
-            "создании таблицы НИКОГДА не добавляй столбцы в одной итерации. Отправь выполнение функции на создание "
-            "таблицы, а в следующей итерации выполняй действия с полученным id. Завершение задачи должно выполняться"
-            " через task_end. Если функция вернула что-то кроме 'Не найдено' - действие выполнено и повторно его "
-            "выполнять не требуется. Если больше задач нет и все действия выполнены - используй task_end."
-        )
-
+        tool = self.registry.get(function_name)
+        if tool is None:
+            return True, "Неизвестная функция."
+        result = await tool.handler(arguments, user_id)
+        if function_name in SCHEMA_TOOLS:
+            self.schema_cache.invalidate(user_id)
+        return not tool.final, pager.text(result if isinstance(result, str) else str(result), user_id)
+
+    async def _read_only_call(self, function_name, user_id, arguments):
+        async with self.tool_semaphore:
+            return await self._tools_calling(function_name, user_id, arguments)
+
+    async def _run_tool_calls(self, calls: List[Tuple[str, Dict]], user_id: int) -> List[Tuple[bool, str]]:
+        results = []
+        batch = []
+        for function_name, arguments in calls + [(None, None)]:
+            if function_name in READ_ONLY_TOOLS:
+                batch.append(self._read_only_call(function_name, user_id, arguments))
+                continue
+            if batch:
+                results.extend(await asyncio.gather(*batch))
+                batch = []
+            if function_name is not None:
+                if function_name != "task_end":
+                    self.write_calls[user_id] = self.write_calls.get(user_id, 0) + 1
+                results.append(await self._tools_calling(function_name, user_id, arguments))
+        return results
+
+    async def _report(self, messages: List[Dict], on_text=None) -> str:
+        if on_text is None:
+            response = await AIHandler.ai.chat(model=self.router.small, messages=messages)
+            return strip_think(response["message"]["content"])
+        think = ThinkFilter()
+        async for part in AIHandler.ai.stream(model=self.router.small, messages=messages):
+            await on_text(think.feed(part["message"]["content"]))
+        return think.close()
+
+    async def _call_ollama(self, query: str, user_id: int, on_text=None) -> str:
         context = await self._get_user_context(user_id)
-        history = context.get("history", [])
-
-        history.append({"role": "user", "content": query})
+        catalog = await self.schema_cache.describe(user_id)
         messages = [
-            {"role": "system", "content": system_prompt},
-            *history
+            {"role": "system", "content": self.loop_prompt},
+            {"role": "system", "content": catalog},
+            *self.memory.prompt(context),
+            {"role": "user", "content": query}
         ]
 
-        await self._set_user_context(user_id, {**context, "history": history[-20:]})
-        new_messages = [{"role": "system", "content": "Тебе необходимо составить отчёт по выполнению задания "
-                                                      "пользователя. Вся информация о выполнении также будет указана в "
-                                                      "автоматизированных запросах пользователя. Нужно указывать "
-                                                      "только итоговый результат операций. Итоговый результат "
-                                                      "находится под указателем user. Отвечай на изначальный "
-                                                      "запрос пользователя. Если требуемый результат не был достигнут, "
-                                                      "так и пиши! Врать нельзя. Также можешь попросить уточнить "
-                                                      "запрос. Если была найдена какая-то ошибка - укажи её. Если же "
-                                                      "пользователь попросил получить какие-то данные и дополнительно "
-                                                      "обработать их - твой ответ должен не ограничиваться отчётом. "
-                                                      "Нужно выполнить форматирование в требуемом виде."}]
+        await self._remember(user_id, {"role": "user", "content": query})
+        new_messages = [{"role": "system", "content": self.report_prompt}]
         repeat_state = True
         repeats_count = 0
+        # The tool list sits at the start of the prompt, so it is chosen once and widened at most once per turn.
+        tools = self.registry.select(query)
+        model = self.router.for_loop(query)
         while repeat_state:
-
-            response = AIHandler.ai.chat(
-                model=AIHandler.model,
-                messages=messages,
-                tools=self.tools
-            )
+            response = await AIHandler.ai.chat(model=model, messages=messages, tools=tools)
+            if model != self.router.large and not self.router.valid(response["message"], self.registry):
+                model = self.router.escalate(model)
+                tools = self.registry.select(query, full=True)
+                response = await AIHandler.ai.chat(model=model, messages=messages, tools=tools)
 
             new_messages.append({"role": "assistant", "content": response["message"]["content"]})
             new_messages.append({"role": "user", "content": "Это автоматически сгенерированный ответ с выводом функций."})
@@ -383,14 +534,14 @@ class AIHandler:
 
             if "tool_calls" in response["message"]:
                 tool_calls = response["message"]["tool_calls"]
-
+                calls = []
                 for tool_call in tool_calls:
                     print(tool_call)
                     tool_call = dict(tool_call['function'])
-                    function_name = tool_call["name"]
-                    arguments = tool_call["arguments"]
+                    calls.append((tool_call["name"], tool_call["arguments"]))
 
-                    tool_call_result = await self._tools_calling(function_name, user_id, arguments)
+                tool_call_results = await self._run_tool_calls(calls, user_id)
+                for (function_name, arguments), tool_call_result in zip(calls, tool_call_results):
                     repeat, result = tool_call_result
                     repeats_count += 1
                     if not repeat or repeats_count >= 6:
@@ -400,17 +551,61 @@ class AIHandler:
                     new_messages[-1]['content'] += '\n' + function_name + ': ' + result
                 messages[-1]['content'] += f'\n\nВсего было использовано {len(tool_calls)} функций.'
                 new_messages[-1]['content'] += f'\n\nВсего было использовано {len(tool_calls)} функций.'
+                fresh = await self.schema_cache.describe(user_id)
+                if fresh != catalog:
+                    catalog = fresh
+                    messages[-1]['content'] += '\n\nОбновлённый список таблиц:\n' + catalog
             else:
+                tools = self.registry.select(query, full=True)
                 messages[-1]['content'] += '\n\nTOOLS НЕ БЫЛИ ИСПОЛЬЗОВАНЫ.'
                 new_messages[-1]['content'] += '\n\nTOOLS НЕ БЫЛИ ИСПОЛЬЗОВАНЫ.'
         else:
-            response = AIHandler.ai.chat(
-                model=AIHandler.model,
-                messages=new_messages
-            )
-            history.append({'role': 'assistant', 'content': response['message']['content']})
-            await self._set_user_context(user_id, {**context, "history": history[-20:]})
-            return response['message']['content']
+            report = await self._report(new_messages, on_text)
+            context = await self._remember(user_id, {'role': 'assistant', 'content': report})
+            self.schema_cache.log_stats()
+            self.memory.schedule_summary(user_id, context)
+            return report
+
+    async def _call_ollama_plan(self, query: str, user_id: int, on_text=None) -> str:
+        context = await self._get_user_context(user_id)
+        messages = [
+            {"role": "system", "content": PLAN_PROMPT},
+            {"role": "system", "content": await self.schema_cache.describe(user_id)},
+            *self.memory.prompt(context),
+            {"role": "user", "content": query}
+        ]
+
+        response = await AIHandler.ai.chat(model=self.router.large, messages=messages, format="json")
+        try:
+            steps = parse_plan(response["message"]["content"])
+        except PlanError:
+            return await self._call_ollama(query, user_id, on_text)
+
+        try:
+            results = await PlanExecutor(user_id).execute(steps)
+            outcome = "План выполнен:\n" + "\n".join(results) if results else "План пуст, действия не выполнялись."
+        except PlanError as e:
+            outcome = f"План не выполнен. {e}"
+        self.schema_cache.invalidate(user_id)
+
+        report = await self._report([
+            {"role": "system", "content": self.report_prompt},
+            {"role": "user", "content": query},
+            {"role": "assistant", "content": response["message"]["content"]},
+            {"role": "user", "content": "Это автоматически сгенерированный ответ с выводом функций.\n" + outcome}
+        ], on_text)
+        context = await self._remember(user_id, {"role": "user", "content": query},
+                                       {'role': 'assistant', 'content': report})
+        self.memory.schedule_summary(user_id, context)
+        return report
+
+    @staticmethod
+    async def _next_page(args: Dict[str, Any], user_id: int) -> str:
+        return pager.next_page(str(args.get("cursor") or ""), user_id)
+
+    @staticmethod
+    async def _task_end(args: Dict[str, Any], user_id: int) -> str:
+        return "Задача завершена."
 
     @staticmethod
     async def _tables_create(args: Dict[str, Any], user_id: int) -> str:
@@ -426,7 +621,7 @@ class AIHandler:
         async with async_session_maker() as session:
             crud = CRUD(session)
             record = await crud.get(Tables, record_id, user_id=user_id)
-            return str(record)
+            return pager.records([record] if record else [], user_id)
 
     @staticmethod
     async def _tables_update(args: Dict[str, Any], user_id: int) -> str:
@@ -465,7 +660,7 @@ class AIHandler:
         async with async_session_maker() as session:
             crud = CRUD(session)
             record = await crud.get(Columns, record_id, user_id=user_id)
-            return str(record)
+            return pager.records([record] if record else [], user_id)
 
     @staticmethod
     async def _columns_update(args: Dict[str, Any], user_id: int) -> str:
@@ -510,13 +705,28 @@ class AIHandler:
             )
             return f"Данные созданы с двойным ID: {record_id}" if isinstance(record_id, int) else record_id
 
+    @staticmethod
+    async def _rows_insert(args: Dict[str, Any], user_id: int) -> str:
+        table_id = args.get("table_id")
+        rows = args.get("rows") or []
+        if not all(isinstance(row, dict) for row in rows):
+            return "Каждая строка должна быть объектом { название колонки: значение }."
+        async with async_session_maker() as session:
+            crud = CRUD(session)
+            row_ids = await crud.bulk_insert_rows(table_id, rows, user_id)
+            if not isinstance(row_ids, list):
+                return row_ids
+            if not row_ids:
+                return "Строки не переданы."
+            return f"Добавлено строк: {len(row_ids)}, row_id с {row_ids[0]} по {row_ids[-1]}"
+
     @staticmethod
     async def _data_get(args: Dict[str, Any], user_id: int) -> str:
         record_id = args.get("record_id")
         async with async_session_maker() as session:
             crud = CRUD(session)
             record = await crud.get(Data, record_id, user_id=user_id)
-            return str(record)
+            return pager.records([record] if record else [], user_id)
 
     @staticmethod
     async def _data_update(args: Dict[str, Any], user_id: int) -> str:
@@ -537,40 +747,47 @@ class AIHandler:
             success = await crud.delete(Data, record_id, user_id=user_id, column_id=column_id)
             return "Удалено" if success else "Не найдено"
 
-    async def _list_records(self, args: Dict[str, Any], user_id: int) -> str:
-        model_name = args.get("model")
-        filters = args.get("filters", {})
-
-        model_map = {
-            "Users": Users,
-            "Tables": Tables,
-            "Columns": Columns,
-            "Data": Data
-        }
-
-        model = model_map.get(model_name)
-        if not model:
-            return "Неверное имя таблицы."
+    @staticmethod
+    async def _table_read(args: Dict[str, Any], user_id: int) -> str:
+        table_id = args.get("table_id")
+        columns = args.get("columns") or None
+        limit = int(args.get("limit") or 50)
+        offset = int(args.get("offset") or 0)
+        async with async_session_maker() as session:
+            crud = CRUD(session)
+            rows = await crud.read_table(table_id, user_id, columns, limit=limit + 1, offset=offset)
+            return rows if isinstance(rows, str) else pager.records(rows, user_id, limit=limit, offset=offset)
 
+    @staticmethod
+    async def _data_search(args: Dict[str, Any], user_id: int) -> str:
+        query = args.get("query") or ""
+        table_id = args.get("table_id")
+        limit = args.get("limit") or 20
         async with async_session_maker() as session:
             crud = CRUD(session)
-            records = await crud.list_all(model, user_id)
+            hits = await crud.search(query, user_id, table_id=table_id, limit=limit)
+            return pager.records(hits, user_id)
 
-            filtered_records = []
-            for record in records:
-                match = True
-                for key, value in filters.items():
-                    if key not in record or not await self._match_filter(record[key], value):
-                        match = False
-                        break
-                if match:
-                    filtered_records.append(record)
+    @staticmethod
+    async def _data_aggregate(args: Dict[str, Any], user_id: int) -> str:
+        column_id = args.get("column_id")
+        function = str(args.get("function") or "").lower()
+        group_by_column_id = args.get("group_by_column_id")
+        async with async_session_maker() as session:
+            crud = CRUD(session)
+            result = await crud.aggregate(column_id, function, user_id, group_by_column_id=group_by_column_id,
+                                          limit=AIHandler.group_limit + 1)
+            return result if isinstance(result, str) else pager.records(result, user_id, limit=AIHandler.group_limit)
 
-            return str(filtered_records)
+    async def _list_records(self, args: Dict[str, Any], user_id: int) -> str:
+        return await self._list_records_with_filters(args, user_id)
 
     async def _list_records_with_filters(self, args: Dict[str, Any], user_id: int) -> str:
         model_name = args.get("model")
-        filters = args.get("filters", {})
+        filters = args.get("filters") or {}
+        limit = int(args.get("limit") or self.list_limit)
+        offset = int(args.get("offset") or 0)
+        order_by = args.get("order_by")
 
         model_map = {
             "Users": Users,
@@ -585,28 +802,6 @@ class AIHandler:
 
         async with async_session_maker() as session:
             crud = CRUD(session)
-            records = await crud.list_all(model, user_id)
-
-            filtered_records = []
-            for record in records:
-                match = True
-                for key, value in filters.items():
-                    if key not in record or not await self._match_filter(record[key], value):
-                        match = False
-                        break
-                if match:
-                    filtered_records.append(record)
-
-            return str(filtered_records)
-
-    async def _match_filter(self, field_value: Any, filter_value: Any) -> bool:
-        if isinstance(filter_value, dict):
-            if "like" in filter_value:
-                return isinstance(field_value, str) and filter_value["like"] in field_value
-            elif "eq" in filter_value:
-                return field_value == filter_value["eq"]
-            elif "gt" in filter_value:
-                return field_value > filter_value["gt"]
-            elif "lt" in filter_value:
-                return field_value < filter_value["lt"]
-        return field_value == filter_value
\ No newline at end of file
+            records = await crud.list_filtered(model, filters, user_id, limit=limit + 1, offset=offset,
+                                               order_by=order_by)
+            return pager.records(records, user_id, limit=limit, offset=offset)
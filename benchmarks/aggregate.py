@@ -0,0 +1,68 @@
+"""data_aggregate vs pulling a column through list_records_with_filters.
+
+Reports time and the size of the text the model would receive.
+
+Run from the repository root: python -m benchmarks.aggregate [rows ...]
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from crud import CRUD
+from db_config import Users, Tables, Columns, Data, Migration, make_engine
+
+SIZES = (1_000, 10_000, 100_000)
+CITIES = ("Москва", "Казань", "Омск", "Тула", "Сочи")
+
+
+async def bench(rows: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        await Migration.up(engine)
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_maker() as session:
+            session.add(Users(id=1, username="bench"))
+            session.add(Tables(id=1, userid=1, table_name="Orders"))
+            session.add_all([
+                Columns(id=1, table_id=1, column_name="City", type="TEXT"),
+                Columns(id=2, table_id=1, column_name="Price", type="REAL"),
+            ])
+            await session.commit()
+            crud = CRUD(session)
+            payload = [{"City": random.choice(CITIES), "Price": round(random.uniform(1, 1000), 2)} for _ in range(rows)]
+            await crud.bulk_insert_rows(1, payload, 1)
+
+            started = time.perf_counter()
+            cells = await crud.list_filtered(Data, {"column_id": {"eq": 2}}, 1)
+            dump = str(cells)
+            total = sum(float(cell["data"]) for cell in cells)
+            pull_ms = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            result = await crud.aggregate(2, "sum", 1)
+            sum_ms = (time.perf_counter() - started) * 1000
+            assert abs(result[0]["value"] - total) < 1e-6 * total
+
+            started = time.perf_counter()
+            grouped = await crud.aggregate(2, "avg", 1, group_by_column_id=1)
+            group_ms = (time.perf_counter() - started) * 1000
+            assert len(grouped) == len(CITIES)
+        await engine.dispose()
+    print(f"{rows:>8}{pull_ms:>12.1f}{len(dump):>14}{sum_ms:>10.1f}{len(str(result)):>8}"
+          f"{group_ms:>14.1f}{len(str(grouped)):>8}")
+
+
+async def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(f"{'rows':>8}{'pull, ms':>12}{'pull, chars':>14}{'sum, ms':>10}{'chars':>8}{'avg by, ms':>14}{'chars':>8}")
+    for rows in sizes:
+        await bench(rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
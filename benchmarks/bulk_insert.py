@@ -0,0 +1,70 @@
+"""Filling a 500-row table: one data_create per cell vs a single rows_insert.
+
+Run from the repository root: python -m benchmarks.bulk_insert [rows]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import insert, select, func
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from crud import CRUD
+from db_config import Users, Tables, Columns, Data, Migration
+
+ROWS = 500
+COLUMNS = 8
+
+
+async def prepare(engine):
+    await Migration.up(engine)
+    async with engine.begin() as conn:
+        await conn.execute(insert(Users).values(id=1, username="bench"))
+        for table_id in (1, 2):
+            await conn.execute(insert(Tables).values(id=table_id, userid=1, table_name=f"t{table_id}"))
+            await conn.execute(insert(Columns), [
+                {"id": table_id * 100 + i, "table_id": table_id, "column_name": f"c{i}", "type": "TEXT"}
+                for i in range(COLUMNS)
+            ])
+
+
+async def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    payload = [{f"c{i}": f"value {row} {i}" for i in range(COLUMNS)} for row in range(rows)]
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        await prepare(engine)
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+        started = time.perf_counter()
+        for row_id, row in enumerate(payload, start=1):
+            for i in range(COLUMNS):
+                async with session_maker() as session:
+                    await CRUD(session).create(Data, {"column_id": 100 + i, "row_id": row_id, "data": row[f"c{i}"]}, 1)
+        per_cell = time.perf_counter() - started
+
+        started = time.perf_counter()
+        async with session_maker() as session:
+            row_ids = await CRUD(session).bulk_insert_rows(2, payload, 1)
+        bulk = time.perf_counter() - started
+
+        async with session_maker() as session:
+            counts = [
+                (await session.execute(
+                    select(func.count()).select_from(Data).join(Columns).where(Columns.table_id == table_id)
+                )).scalar()
+                for table_id in (1, 2)
+            ]
+        await engine.dispose()
+
+    assert counts == [rows * COLUMNS] * 2, counts
+    assert row_ids == list(range(1, rows + 1))
+    print(f"{rows} rows x {COLUMNS} columns = {rows * COLUMNS} cells")
+    print(f"data_create per cell: {rows * COLUMNS} tool calls, {rows * COLUMNS} commits, {per_cell:.2f} s")
+    print(f"rows_insert:          1 tool call, 1 commit, {bulk * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
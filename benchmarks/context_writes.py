@@ -0,0 +1,83 @@
+"""Users.context traffic of a burst of messages: direct read/rewrite/commit vs the write-behind ContextStore.
+
+Run from the repository root: python -m benchmarks.context_writes [users] [messages_per_user]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from context_store import ContextStore
+from db_config import Users, Migration, make_engine
+
+USERS = 200
+MESSAGES = 5
+
+
+class DirectStore:
+    def __init__(self, session_maker):
+        self.session_maker = session_maker
+
+    async def get(self, user_id: int) -> dict:
+        async with self.session_maker() as session:
+            user = (await session.execute(select(Users).where(Users.id == user_id))).scalars().first()
+            return user.context if user and user.context else {}
+
+    async def set(self, user_id: int, context: dict):
+        async with self.session_maker() as session:
+            user = (await session.execute(select(Users).where(Users.id == user_id))).scalars().first()
+            user.context = context
+            await session.commit()
+
+    async def close(self):
+        pass
+
+
+async def conversation(store, user_id: int, messages: int):
+    for i in range(messages):
+        context = await store.get(user_id)
+        history = context.get("history", []) + [{"role": "user", "content": f"сообщение {i} " * 20}]
+        await store.set(user_id, {**context, "history": history})
+        await asyncio.sleep(0.01)
+        history = history + [{"role": "assistant", "content": f"ответ {i} " * 40}]
+        await store.set(user_id, {**context, "history": history})
+
+
+async def run(label: str, make_store, users: int, messages: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        await Migration.up(engine)
+        async with engine.begin() as conn:
+            await conn.execute(insert(Users), [{"id": u, "username": f"u{u}", "context": {}} for u in range(users)])
+        statements, commits = [], []
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(1))
+        event.listen(engine.sync_engine, "commit", lambda *args: commits.append(1))
+        store = make_store(async_sessionmaker(engine, expire_on_commit=False))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(conversation(store, u, messages) for u in range(users)))
+        await store.close()
+        elapsed = time.perf_counter() - started
+
+        async with engine.connect() as conn:
+            stored = (await conn.execute(select(Users.context).where(Users.id == users - 1))).scalar_one()
+        await engine.dispose()
+    assert len(stored["history"]) == messages * 2
+    print(f"{label:<14}{len(statements):>12}{len(commits):>10}{elapsed * 1000:>12.0f}")
+
+
+async def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else USERS
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else MESSAGES
+    print(f"{users} users x {messages} messages")
+    print(f"{'store':<14}{'statements':>12}{'commits':>10}{'ms':>12}")
+    await run("direct", DirectStore, users, messages)
+    await run("write-behind", lambda maker: ContextStore(maker, flush_interval=0.05), users, messages)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""Concurrent simulated users writing contexts and cells.
+
+Compares the old layout (two independent engines on the same file, rollback
+journal) with the shared engine from db_config.make_engine (WAL + pragmas).
+
+Run from the repository root: python -m benchmarks.db_writes [users] [ops]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from crud import CRUD
+from db_config import Users, Tables, Columns, Data, Migration, make_engine
+
+USERS = 50
+OPS = 20
+
+
+async def prepare(engine, users: int):
+    await Migration.up(engine)
+    async with engine.begin() as conn:
+        await conn.execute(insert(Users), [{"id": u, "username": f"u{u}", "context": {}} for u in range(users)])
+        await conn.execute(insert(Tables), [{"id": u, "userid": u, "table_name": "t"} for u in range(users)])
+        await conn.execute(insert(Columns), [
+            {"id": u, "table_id": u, "column_name": "c", "type": "TEXT"} for u in range(users)
+        ])
+
+
+async def simulate_user(context_sessions, data_sessions, user_id: int, ops: int, errors: list):
+    history = []
+    for op in range(ops):
+        history.append({"role": "user", "content": f"message {op}" * 20})
+        try:
+            async with context_sessions() as session:
+                await session.execute(update(Users).where(Users.id == user_id).values(context={"history": history}))
+                await session.commit()
+            async with data_sessions() as session:
+                await CRUD(session).create(Data, {"column_id": user_id, "row_id": op, "data": f"v{op}"}, user_id)
+        except OperationalError as e:
+            errors.append(str(e.orig))
+
+
+async def run(name: str, context_engine, data_engine, users: int, ops: int):
+    await prepare(context_engine, users)
+    context_sessions = async_sessionmaker(context_engine, expire_on_commit=False)
+    data_sessions = async_sessionmaker(data_engine, expire_on_commit=False)
+    errors = []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        simulate_user(context_sessions, data_sessions, u, ops, errors) for u in range(users)
+    ))
+    elapsed = time.perf_counter() - started
+    writes = users * ops * 2
+    print(f"{name:<28}{elapsed:>9.2f}{(writes - len(errors)) / elapsed:>12.0f}{len(errors):>8}")
+    await context_engine.dispose()
+    await data_engine.dispose()
+
+
+async def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else USERS
+    ops = int(sys.argv[2]) if len(sys.argv) > 2 else OPS
+    print(f"{users} users x {ops} messages, 2 write transactions per message")
+    print(f"{'layout':<28}{'total, s':>9}{'writes/s':>12}{'errors':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'old.db')}"
+        await run("two engines, rollback", create_async_engine(url), create_async_engine(url), users, ops)
+        shared = make_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'new.db')}")
+        await run("shared engine, WAL", shared, shared, users, ops)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
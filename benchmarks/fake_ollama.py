@@ -0,0 +1,146 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+
+class FakeOllama:
+    def __init__(self, delay: float = 0.2, parallel: int = 4, reply: str = "ok", tool_calls=None, script=None,
+                 prefill_per_token: float = 0.0, token_delay: float = 0.0, model_delays=None,
+                 prefix_cache: bool = False, load_time: float = 0.0, default_keep_alive: float = 300.0):
+        self.delay = delay
+        self.prefix_cache = prefix_cache
+        self.load_time = load_time
+        self.default_keep_alive = default_keep_alive
+        self.loads = 0
+        self.uncached = []
+        self._prompts = {}
+        self._loaded_until = {}
+        self.model_delays = model_delays or {}
+        self.token_delay = token_delay
+        self.prefill_per_token = prefill_per_token
+        self.script = script
+        self.parallel = parallel
+        self.reply = reply
+        self.tool_calls = tool_calls
+        self.requests = []
+        self.host = None
+        self._loop = None
+        self._runner = None
+        self._thread = None
+
+    def _message(self, content):
+        message = {"role": "assistant", "content": content}
+        if self.tool_calls:
+            message["tool_calls"] = self.tool_calls
+        return message
+
+    @staticmethod
+    def prompt_tokens(body: dict) -> int:
+        prompt = json.dumps([body.get("messages"), body.get("tools")], ensure_ascii=False)
+        return len(prompt) // 3
+
+    @staticmethod
+    def render(body: dict) -> str:
+        return json.dumps([body.get("tools"), body.get("messages")], ensure_ascii=False)
+
+    def _keep_alive(self, body: dict) -> float:
+        value = body.get("keep_alive")
+        if value is None:
+            return self.default_keep_alive
+        if isinstance(value, str) and value[-1:] in ("s", "m", "h"):
+            return float(value[:-1]) * {"s": 1, "m": 60, "h": 3600}[value[-1]]
+        value = float(value)
+        return float("inf") if value < 0 else value
+
+    def _uncached_tokens(self, body: dict) -> int:
+        if not self.prefix_cache:
+            return self.prompt_tokens(body)
+        prompt = self.render(body)
+        cached = os.path.commonprefix([self._prompts.get(body.get("model"), ""), prompt])
+        self._prompts[body.get("model")] = prompt
+        self.uncached.append((len(prompt) - len(cached)) // 3)
+        return self.uncached[-1]
+
+    async def _chat(self, request: web.Request):
+        body = await request.json()
+        self.requests.append(body)
+        model = body.get("model")
+        load = 0.0
+        if self.load_time and time.monotonic() > self._loaded_until.get(model, 0.0):
+            load = self.load_time
+            self.loads += 1
+            self._loaded_until[model] = float("inf")
+        prompt_tokens = self._uncached_tokens(body) if body.get("messages") else 0
+        prefill = prompt_tokens * self.prefill_per_token
+        delay = self.model_delays.get(model, self.delay) if body.get("messages") else 0.0
+        async with self._semaphore:
+            await asyncio.sleep(load + delay + prefill)
+        self._loaded_until[model] = time.monotonic() + self._keep_alive(body)
+        stats = {"prompt_eval_count": prompt_tokens, "prompt_eval_duration": int(prefill * 1e9)}
+        created_at = datetime.now(timezone.utc).isoformat()
+        if not body.get("messages"):
+            return web.json_response({"model": model, "created_at": created_at,
+                                      "message": {"role": "assistant", "content": ""}, "done": True})
+        if self.script is not None:
+            message = {"role": "assistant", "content": "", **self.script(body)}
+        else:
+            message = self._message(self.reply)
+        if not body.get("stream", True):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay * len(message["content"].split(" ")))
+            return web.json_response({
+                "model": body.get("model"),
+                "created_at": created_at,
+                "message": message,
+                "done": True,
+                **stats,
+            })
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        for token in message["content"].split(" "):
+            chunk = {"model": body.get("model"), "created_at": created_at,
+                     "message": {"role": "assistant", "content": token + " "}, "done": False}
+            await response.write((json.dumps(chunk) + "\n").encode())
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+        chunk = {"model": body.get("model"), "created_at": created_at,
+                 "message": {**message, "content": ""}, "done": True, **stats}
+        await response.write((json.dumps(chunk) + "\n").encode())
+        await response.write_eof()
+        return response
+
+    async def _start(self, started: threading.Event):
+        self._semaphore = asyncio.Semaphore(self.parallel)
+        app = web.Application()
+        app.router.add_post("/api/chat", self._chat)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.host = f"127.0.0.1:{port}"
+        started.set()
+
+    def start(self) -> str:
+        started = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self._start(started))
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.host
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
@@ -0,0 +1,75 @@
+"""Simple read-only requests: agent loop vs the deterministic fast path.
+
+The agent path is the cheapest possible loop against a fake model with
+DELAY per generation: one tool generation (task_end) plus the report.
+
+Run from the repository root: python -m benchmarks.fast_path
+"""
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+TMP = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(TMP, 'bench.db')}"
+
+from ai import AIHandler  # noqa: E402
+from benchmarks.fake_ollama import FakeOllama  # noqa: E402
+from crud import CRUD  # noqa: E402
+from db_config import Users, Tables, Columns, Migration, engine, async_session_maker  # noqa: E402
+from llm import LLMPool  # noqa: E402
+
+DELAY = 0.5
+ROUNDS = 5
+FAST = ["Покажи мои таблицы", "какие у меня есть таблицы?", "список таблиц", "show my tables",
+        "Покажи таблицу Клиенты", "открой таблицу «клиенты»", "show table Клиенты"]
+AGENT = ["Покажи таблицу Заказы", "добавь клиента Иван", "сколько клиентов из Москвы?",
+         "покажи таблицы где больше 10 строк"]
+
+
+def scripted_model(body: dict) -> dict:
+    if body.get("tools"):
+        return {"tool_calls": [{"function": {"name": "task_end", "arguments": {}}}]}
+    return {"content": "Готово."}
+
+
+async def timed(handler: AIHandler, query: str) -> float:
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        await handler.handle_query(query, 1)
+    return time.perf_counter() - started
+
+
+async def main():
+    server = FakeOllama(delay=DELAY, script=scripted_model)
+    AIHandler.ai = LLMPool(server.start())
+    await Migration.up(engine)
+    async with async_session_maker() as session:
+        session.add(Users(id=1, username="bench", context={}))
+        session.add(Tables(id=1, userid=1, table_name="Клиенты"))
+        session.add_all([Columns(id=1, table_id=1, column_name="Имя", type="TEXT"),
+                         Columns(id=2, table_id=1, column_name="Город", type="TEXT")])
+        await session.commit()
+        await CRUD(session).bulk_insert_rows(1, [{"Имя": f"Клиент {i}", "Город": "Москва"} for i in range(100)], 1)
+    try:
+        handler = AIHandler()
+        fast = [await timed(handler, query) for query in FAST * ROUNDS]
+        generations = len(server.requests)
+        agent = [await timed(handler, query) for query in AGENT]
+        answer = await handler.handle_query("покажи таблицу клиенты", 1)
+    finally:
+        server.stop()
+        await engine.dispose()
+    assert generations == 0 and "Клиент 0 | Москва" in answer
+    print(f"fake model: {DELAY * 1000:.0f} ms per generation")
+    print(f"fast path: {len(fast)} requests, 0 generations, avg {sum(fast) / len(fast) * 1000:.1f} ms")
+    print(f"agent:     {len(AGENT)} requests, {len(server.requests)} generations, "
+          f"avg {sum(agent) / len(agent) * 1000:.0f} ms")
+    print(f"hit rate: {handler.fast_path.hit_rate:.0%} ({handler.fast_path.hits}/"
+          f"{handler.fast_path.hits + handler.fast_path.misses})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""list_records_with_filters: Python-side filtering vs SQL WHERE push-down.
+
+Run from the repository root: python -m benchmarks.list_filters [cells ...]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from crud import CRUD
+from db_config import Users, Tables, Columns, Data, Migration
+
+SIZES = (10_000, 100_000, 1_000_000)
+COLUMNS = 10
+NAMES = ("Анна", "Борис", "Влад", "Галина", "Дмитрий", "Елена", "Жанна", "Зоя")
+FILTERS = {"column_id": {"eq": 1}, "data": {"like": "Влад"}}
+
+
+def _match_filter(field_value, filter_value) -> bool:
+    if isinstance(filter_value, dict):
+        if "like" in filter_value:
+            return isinstance(field_value, str) and filter_value["like"] in field_value
+        elif "eq" in filter_value:
+            return field_value == filter_value["eq"]
+        elif "gt" in filter_value:
+            return field_value > filter_value["gt"]
+        elif "lt" in filter_value:
+            return field_value < filter_value["lt"]
+    return field_value == filter_value
+
+
+async def old_path(crud: CRUD, model, filters: dict, user_id: int):
+    records = await crud.list_all(model, user_id)
+    return [r for r in records if all(k in r and _match_filter(r[k], v) for k, v in filters.items())]
+
+
+async def fill(engine, cells: int):
+    await Migration.up(engine)
+    async with engine.begin() as conn:
+        await conn.execute(insert(Users).values(id=1, username="bench"))
+        await conn.execute(insert(Tables).values(id=1, userid=1, table_name="Clients"))
+        await conn.execute(insert(Columns), [
+            {"id": i, "table_id": 1, "column_name": f"c{i}", "type": "TEXT"} for i in range(1, COLUMNS + 1)
+        ])
+        rows = cells // COLUMNS
+        batch = []
+        for row_id in range(1, rows + 1):
+            for column_id in range(1, COLUMNS + 1):
+                batch.append({"row_id": row_id, "column_id": column_id,
+                              "data": f"{NAMES[(row_id + column_id) % len(NAMES)]} {row_id}"})
+            if len(batch) >= 50_000:
+                await conn.execute(insert(Data), batch)
+                batch = []
+        if batch:
+            await conn.execute(insert(Data), batch)
+
+
+async def bench(cells: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        await fill(engine, cells)
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_maker() as session:
+            crud = CRUD(session)
+            started = time.perf_counter()
+            old = await old_path(crud, Data, FILTERS, 1)
+            old_time = time.perf_counter() - started
+            started = time.perf_counter()
+            new_all = await crud.list_filtered(Data, FILTERS, 1)
+            new_time = time.perf_counter() - started
+            started = time.perf_counter()
+            await crud.list_filtered(Data, FILTERS, 1, limit=100)
+            page_time = time.perf_counter() - started
+        await engine.dispose()
+    assert sorted(map(str, old)) == sorted(map(str, new_all)), "results differ"
+    print(f"{cells:>10}{len(old):>9}{old_time * 1000:>12.1f}{new_time * 1000:>12.1f}{page_time * 1000:>14.1f}")
+
+
+async def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(f"filters: {FILTERS}")
+    print(f"{'cells':>10}{'matches':>9}{'python, ms':>12}{'sql, ms':>12}{'sql+limit, ms':>14}")
+    for cells in sizes:
+        await bench(cells)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""Listing every cell: ORM list_all vs keyset-paginated CRUD.iter_all.
+
+Reports time to first row, total time and peak Python memory.
+
+Run from the repository root: python -m benchmarks.list_streaming [cells]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from benchmarks.list_filters import fill
+from crud import CRUD
+from db_config import Data, make_engine
+
+CELLS = 300_000
+
+
+async def orm_list_all(session, model):
+    result = await session.execute(select(model))
+    for record in result.scalars().all():
+        yield {col.name: getattr(record, col.name) for col in record.__table__.columns}
+
+
+async def measure(make_rows):
+    started = time.perf_counter()
+    first = None
+    count = 0
+    async for _ in make_rows():
+        if first is None:
+            first = time.perf_counter() - started
+        count += 1
+    total = time.perf_counter() - started
+
+    tracemalloc.start()
+    async for _ in make_rows():
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, first, total, peak
+
+
+async def main():
+    cells = int(sys.argv[1]) if len(sys.argv) > 1 else CELLS
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        await fill(engine, cells)
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_maker() as session:
+            crud = CRUD(session)
+
+            def orm():
+                session.expunge_all()
+                return orm_list_all(session, Data)
+
+            async def materialized():
+                for record in await crud.list_all(Data):
+                    yield record
+
+            results = {
+                "ORM list_all": await measure(orm),
+                "list_all (rows)": await measure(materialized),
+                "iter_all stream": await measure(lambda: crud.iter_all(Data)),
+            }
+        await engine.dispose()
+
+    print(f"{cells} cells")
+    print(f"{'variant':<18}{'rows':>9}{'first row, ms':>15}{'total, s':>10}{'peak, MB':>10}")
+    for name, (count, first, total, peak) in results.items():
+        assert count == cells, (name, count)
+        print(f"{name:<18}{count:>9}{first * 1000:>15.1f}{total:>10.2f}{peak / 2 ** 20:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+"""Throughput of N simultaneous users: blocking ollama.Client vs LLMPool.
+
+Run from the repository root: python -m benchmarks.llm_concurrency
+"""
+import asyncio
+import time
+
+import ollama
+
+from benchmarks.fake_ollama import FakeOllama
+from llm import LLMPool
+
+DELAY = 0.2
+SERVER_PARALLEL = 4
+USERS = (1, 2, 4, 8, 16)
+CAPS = (1, 2, 4, 8)
+
+
+async def _loop_lag(stop: asyncio.Event) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - started - 0.01)
+    return worst
+
+
+async def _run(chat, users: int):
+    stop = asyncio.Event()
+    lag = asyncio.create_task(_loop_lag(stop))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await asyncio.gather(*(chat() for _ in range(users)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return elapsed, await lag
+
+
+async def main():
+    server = FakeOllama(delay=DELAY, parallel=SERVER_PARALLEL)
+    host = server.start()
+    messages = [{"role": "user", "content": "ping"}]
+    try:
+        sync_client = ollama.Client(host)
+
+        async def blocking_chat():
+            return sync_client.chat(model="fake", messages=messages)
+
+        print(f"fake server: {DELAY * 1000:.0f} ms per generation, {SERVER_PARALLEL} parallel slots")
+        print(f"{'client':<16}{'users':>6}{'total, s':>10}{'req/s':>8}{'max loop lag, ms':>18}")
+        for users in USERS:
+            elapsed, lag = await _run(blocking_chat, users)
+            print(f"{'sync Client':<16}{users:>6}{elapsed:>10.2f}{users / elapsed:>8.1f}{lag * 1000:>18.0f}")
+        for cap in CAPS:
+            pool = LLMPool(host, max_concurrency=cap)
+
+            async def pooled_chat():
+                return await pool.chat(model="fake", messages=messages)
+
+            for users in USERS:
+                elapsed, lag = await _run(pooled_chat, users)
+                name = f"LLMPool cap={cap}"
+                print(f"{name:<16}{users:>6}{elapsed:>10.2f}{users / elapsed:>8.1f}{lag * 1000:>18.0f}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
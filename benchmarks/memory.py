@@ -0,0 +1,94 @@
+"""Prompt size and prefill time over a long conversation.
+
+Compares the old history[-20:] policy with MemoryManager's token budget and
+rolling summary. The fake server charges prefill time per prompt token. The
+back-to-back run does not wait for summaries between turns, so they finish
+while the next turn is running and must not be overwritten by it.
+
+Run from the repository root: python -m benchmarks.memory [turns]
+"""
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+TMP = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(TMP, 'bench.db')}"
+
+from ai import AIHandler  # noqa: E402
+from benchmarks.fake_ollama import FakeOllama  # noqa: E402
+from db_config import Users, Migration, engine, async_session_maker  # noqa: E402
+from llm import LLMPool  # noqa: E402
+from memory import MemoryManager, SUMMARY_PROMPT  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+
+TURNS = 25
+PREFILL_PER_TOKEN = 0.0001
+REPORT = "| Имя | Город | Сумма |\n" + "\n".join(f"| Клиент {i} | Москва | {i * 100} |" for i in range(120))
+
+
+class LastTwenty(MemoryManager):
+    def add(self, context: dict, message: dict) -> dict:
+        return {**context, "history": (context.get("history", []) + [message])[-20:]}
+
+    def schedule_summary(self, user_id: int, context: dict):
+        pass
+
+
+def scripted_model(body: dict) -> dict:
+    if body["messages"][0]["content"] == SUMMARY_PROMPT:
+        return {"content": "Пользователь просматривает таблицу Клиенты (id=1) и просит отчёты по суммам."}
+    if body.get("tools"):
+        return {"tool_calls": [{"function": {"name": "task_end", "arguments": {}}}]}
+    return {"content": REPORT}
+
+
+async def run(handler: AIHandler, server: FakeOllama, turns: int, drain: bool = True):
+    await handler._set_user_context(1, {"history": []})
+    handler.result_cache = ResultCache()
+    pool = LLMPool(server.host)
+    AIHandler.ai = handler.memory.llm = pool
+    sizes = []
+    summarized = 0
+    for turn in range(turns):
+        server.requests.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            await handler.handle_query(f"Покажи отчёт по клиентам №{turn}", 1)
+        summarized += bool((await handler._get_user_context(1)).get("summary"))
+        if drain:
+            await handler.memory.drain()
+        sizes.append(server.prompt_tokens(next(body for body in server.requests if body.get("tools"))))
+    return sizes, pool, summarized
+
+
+async def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else TURNS
+    server = FakeOllama(delay=0.001, script=scripted_model, prefill_per_token=PREFILL_PER_TOKEN)
+    server.start()
+    await Migration.up(engine)
+    async with async_session_maker() as session:
+        session.add(Users(id=1, username="bench", context={}))
+        await session.commit()
+    try:
+        handler = AIHandler()
+        budgeted = await run(handler, server, turns)
+        back_to_back = await run(handler, server, turns, drain=False)
+        handler.memory = LastTwenty(None, AIHandler.model, handler._get_user_context, handler._set_user_context)
+        legacy = await run(handler, server, turns)
+    finally:
+        server.stop()
+        await engine.dispose()
+
+    print(f"{turns} turns, {len(REPORT)}-char reports, {PREFILL_PER_TOKEN * 1e6:.0f} us prefill per prompt token")
+    print(f"{'policy':<22}{'first turn':>12}{'last turn':>12}{'max':>8}{'avg prefill, ms':>18}{'summarized':>12}")
+    runs = (("history[-20:]", legacy), ("token budget", budgeted), ("budget, back-to-back", back_to_back))
+    for name, (sizes, pool, summary) in runs:
+        print(f"{name:<22}{sizes[0]:>12}{sizes[-1]:>12}{max(sizes):>8}"
+              f"{pool.prefill_seconds / pool.calls * 1000:>18.0f}{summary:>12}")
+    assert back_to_back[2] >= budgeted[2] - 1, "summaries finished during a turn were overwritten"
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""One large model for everything vs routing cheap work to a small model.
+
+The fake server answers LARGE in 600 ms and SMALL in 150 ms per generation.
+Each agent turn is one tool call, task_end and the report. The small model
+answers every fourth read request with plain text instead of a tool call,
+which must escalate that iteration to the large model.
+
+Run from the repository root: python -m benchmarks.model_routing
+"""
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+TMP = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(TMP, 'bench.db')}"
+
+from ai import AIHandler  # noqa: E402
+from benchmarks.fake_ollama import FakeOllama  # noqa: E402
+from db_config import Users, Tables, Columns, Migration, engine, async_session_maker  # noqa: E402
+from llm import LLMPool  # noqa: E402
+from model_router import ModelRouter  # noqa: E402
+
+LARGE, SMALL = "large", "small"
+REQUESTS = [
+    "Найди клиентов из Москвы", "Сколько клиентов в каждом городе?", "Покажи последние заказы",
+    "Добавь клиента Иван", "Какие города встречаются чаще всего?", "Измени город клиента 3 на Казань",
+    "Найди заказы больше 1000", "Выведи средний чек", "Удали клиента 5", "Список клиентов из Казани",
+]
+turns = {"small": 0}
+
+
+def scripted_model(body: dict) -> dict:
+    if not body.get("tools"):
+        return {"content": "Готово."}
+    if "автоматически" in body["messages"][-1]["content"]:
+        return {"tool_calls": [{"function": {"name": "task_end", "arguments": {}}}]}
+    if body["model"] == SMALL:
+        turns["small"] += 1
+        if turns["small"] % 4 == 0:
+            return {"content": "Сейчас посмотрю таблицу клиентов."}
+    return {"tool_calls": [{"function": {"name": "table_read", "arguments": {"table_id": 1, "limit": 5}}}]}
+
+
+async def run(handler: AIHandler, router: ModelRouter):
+    handler.router = router
+    AIHandler.ai.model_stats.clear()
+    started = time.perf_counter()
+    for i, query in enumerate(REQUESTS):
+        with contextlib.redirect_stdout(io.StringIO()):
+            await handler.handle_query(query, 1 + i % 3)
+    return time.perf_counter() - started, dict(AIHandler.ai.model_stats), router.escalations
+
+
+async def main():
+    server = FakeOllama(script=scripted_model, model_delays={LARGE: 0.6, SMALL: 0.15})
+    AIHandler.ai = LLMPool(server.start())
+    await Migration.up(engine)
+    async with async_session_maker() as session:
+        for user_id in (1, 2, 3):
+            session.add(Users(id=user_id, username=f"bench{user_id}", context={}))
+            session.add(Tables(id=user_id, userid=user_id, table_name="Клиенты"))
+            session.add(Columns(table_id=user_id, column_name="Город", type="TEXT"))
+        await session.commit()
+    try:
+        handler = AIHandler()
+        results = []
+        for name, router in (("large only", ModelRouter(LARGE, LARGE)), ("routed", ModelRouter(LARGE, SMALL))):
+            handler.result_cache = type(handler.result_cache)()
+            results.append((name, *await run(handler, router)))
+    finally:
+        server.stop()
+        await engine.dispose()
+    print(f"{len(REQUESTS)} requests, {LARGE}: 600 ms, {SMALL}: 150 ms per generation")
+    for name, elapsed, stats, escalations in results:
+        per_model = ", ".join(f"{model}: {s['calls']} calls, avg {s['seconds'] / s['calls'] * 1000:.0f} ms"
+                              for model, s in sorted(stats.items()))
+        print(f"{name:<11} {elapsed:5.1f} s  escalations={escalations}  {per_model}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
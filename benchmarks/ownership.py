@@ -0,0 +1,68 @@
+"""Statements per ownership-checked mutation and the cost of the per-message user lookup.
+
+Run from the repository root: python -m benchmarks.ownership [operations]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from crud import CRUD
+from db_config import Users, Tables, Columns, Data, Migration, make_engine
+from lru import LRUCache
+
+OPERATIONS = 500
+
+
+async def main():
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else OPERATIONS
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        await Migration.up(engine)
+        statements = []
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(1))
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_maker() as session:
+            session.add_all([Users(id=1, username="owner"), Users(id=2, username="stranger")])
+            session.add(Tables(id=1, userid=1, table_name="Items"))
+            session.add(Columns(id=1, table_id=1, column_name="qty", type="INTEGER"))
+            await session.commit()
+            crud = CRUD(session)
+            await crud.bulk_insert_rows(1, [{"qty": str(r)} for r in range(operations)], 1)
+
+            cases = [
+                ("data_update", lambda i: crud.update(Data, i, {"data": str(i * 2)}, user_id=1, column_id=1)),
+                ("data_update (foreign)", lambda i: crud.update(Data, i, {"data": "0"}, user_id=2, column_id=1)),
+                ("columns_update", lambda i: crud.update(Columns, 1, {"column_name": f"qty{i}"}, user_id=1)),
+                ("data_delete", lambda i: crud.delete(Data, i, user_id=1, column_id=1)),
+            ]
+            print(f"{'operation':<24}{'statements/op':>15}{'ms/op':>10}")
+            for name, call in cases:
+                statements.clear()
+                started = time.perf_counter()
+                for i in range(1, operations + 1):
+                    await call(i)
+                elapsed = time.perf_counter() - started
+                print(f"{name:<24}{len(statements) / operations:>15.1f}{elapsed / operations * 1000:>10.3f}")
+
+            known_users = LRUCache()
+            for label, cache in (("user lookup (db)", None), ("user lookup (lru)", known_users)):
+                statements.clear()
+                started = time.perf_counter()
+                for _ in range(operations):
+                    if cache is not None and 1 in cache:
+                        continue
+                    result = await session.execute(select(Users.id).where(Users.id == 1))
+                    if cache is not None and result.scalar_one_or_none():
+                        cache.set(1, 1)
+                elapsed = time.perf_counter() - started
+                print(f"{label:<24}{len(statements) / operations:>15.3f}{elapsed / operations * 1000:>10.3f}")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
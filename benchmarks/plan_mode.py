@@ -0,0 +1,94 @@
+"""Creating a table with 8 columns and 50 rows: tool loop vs plan mode.
+
+A scripted fake model emits what a capable model would: in loop mode the
+table first (the system prompt forbids columns in the same iteration), then
+all columns, then the rows; in plan mode one JSON plan with $t1.id
+references. The loop's cap of 6 tool calls stops it before the rows.
+
+Run from the repository root: python -m benchmarks.plan_mode
+"""
+import asyncio
+import contextlib
+import io
+import json
+import os
+import re
+import tempfile
+import time
+
+TMP = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(TMP, 'bench.db')}"
+
+from ai import AIHandler  # noqa: E402
+from benchmarks.fake_ollama import FakeOllama  # noqa: E402
+from crud import CRUD  # noqa: E402
+from db_config import Users, Migration, engine, async_session_maker  # noqa: E402
+from llm import LLMPool  # noqa: E402
+
+COLUMNS = [f"Поле{i}" for i in range(1, 9)]
+ROWS = [{name: f"{name}-{r}" for name in COLUMNS} for r in range(50)]
+
+
+def call(name, **arguments):
+    return {"function": {"name": name, "arguments": arguments}}
+
+
+def scripted_model(body: dict) -> dict:
+    if body.get("format") == "json":
+        table = body["messages"][-1]["content"].split()[-1]
+        steps = [{"id": "t1", "tool": "tables_create", "args": {"table_name": table}}]
+        steps += [{"id": f"c{i}", "tool": "columns_create",
+                   "args": {"table_id": "$t1.id", "column_name": name, "type": "TEXT"}}
+                  for i, name in enumerate(COLUMNS)]
+        steps.append({"id": "r1", "tool": "rows_insert", "args": {"table_id": "$t1.id", "rows": ROWS}})
+        return {"content": json.dumps({"steps": steps})}
+    if not body.get("tools"):
+        return {"content": "Таблица создана."}
+    text = "\n".join(message.get("content") or "" for message in body["messages"])
+    if "rows_insert: Добавлено" in text:
+        return {"tool_calls": [call("task_end")]}
+    table_id = re.search(r"Таблица создана с ID: (\d+)", text)
+    if not table_id:
+        return {"tool_calls": [call("tables_create", table_name=body["messages"][-1]["content"].split()[-1])]}
+    if "Колонка создана" not in text:
+        return {"tool_calls": [call("columns_create", table_id=int(table_id.group(1)), column_name=name, type="TEXT")
+                               for name in COLUMNS]}
+    return {"tool_calls": [call("rows_insert", table_id=int(table_id.group(1)), rows=ROWS)]}
+
+
+async def run(handler: AIHandler, server: FakeOllama, mode: str, table: str):
+    server.requests.clear()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        answer = await handler.handle_query(f"Создай таблицу {table}", 1, mode=mode)
+    elapsed = time.perf_counter() - started
+    async with async_session_maker() as session:
+        tables = await CRUD(session).schema(1)
+        created = next(t for t in tables if t["table_name"] == table)
+        rows = await CRUD(session).read_table(created["id"], 1, limit=100)
+    return len(server.requests), elapsed, len(created["columns"]), len(rows)
+
+
+async def main():
+    server = FakeOllama(delay=0.05, script=scripted_model)
+    AIHandler.ai = LLMPool(server.start())
+    await Migration.up(engine)
+    async with async_session_maker() as session:
+        session.add(Users(id=1, username="bench", context={}))
+        await session.commit()
+    try:
+        handler = AIHandler()
+        loop = await run(handler, server, "loop", "Loop")
+        plan = await run(handler, server, "plan", "Plan")
+    finally:
+        server.stop()
+        await engine.dispose()
+    print(f"table with {len(COLUMNS)} columns and {len(ROWS)} rows, 50 ms per fake generation")
+    for name, result in (("tool loop", loop), ("plan mode", plan)):
+        print(f"{name}: {result[0]} generations, {result[1] * 1000:.0f} ms, "
+              f"created {result[2]} columns and {result[3]} rows")
+    assert plan[2:] == (len(COLUMNS), len(ROWS))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+"""Query plans of the hot EAV lookups before and after Migration.up.
+
+Builds a database with the schema test.db had before versioned migrations
+(primary keys and unique constraints only, user_version = 0), prints the
+plans and timings, migrates it and prints them again. The plan assertions
+live in tests/test_query_plans.py.
+
+Run from the repository root: python -m benchmarks.query_plans [cells]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import text
+
+from db_config import Migration, make_engine
+
+CELLS = 200_000
+OTHER_USERS = 200
+TABLES_PER_USER = 5
+COLUMNS_PER_TABLE = 10
+NAMES = ("Анна", "Борис", "Влад", "Галина", "Дмитрий", "Елена", "Жанна", "Зоя")
+
+BASELINE_DDL = [
+    "CREATE TABLE users (id INTEGER NOT NULL, username VARCHAR, context JSON, PRIMARY KEY (id), UNIQUE (username))",
+    "CREATE TABLE tables (id INTEGER NOT NULL, userid INTEGER, table_name VARCHAR, PRIMARY KEY (id), "
+    "UNIQUE (userid, table_name), FOREIGN KEY(userid) REFERENCES users (id))",
+    "CREATE TABLE columns (id INTEGER NOT NULL, table_id INTEGER, column_name VARCHAR, type VARCHAR, "
+    "PRIMARY KEY (id), UNIQUE (table_id, column_name), FOREIGN KEY(table_id) REFERENCES tables (id))",
+    "CREATE TABLE data (row_id INTEGER NOT NULL, column_id INTEGER NOT NULL, data VARCHAR, "
+    "PRIMARY KEY (row_id, column_id), FOREIGN KEY(column_id) REFERENCES columns (id))",
+]
+
+QUERIES = {
+    "cells of column": "SELECT row_id, data FROM data WHERE column_id = 3",
+    "cell lookup": "SELECT data FROM data WHERE row_id = 42 AND column_id = 3",
+    "columns of table": "SELECT * FROM columns WHERE table_id = 1",
+    "tables of user": "SELECT * FROM tables WHERE userid = 1",
+}
+
+
+async def baseline(engine, cells: int = CELLS, other_users: int = OTHER_USERS):
+    async with engine.begin() as conn:
+        for statement in BASELINE_DDL:
+            await conn.execute(text(statement))
+        await conn.execute(text("PRAGMA user_version = 0"))
+        users = range(1, other_users + 2)
+        await conn.execute(text("INSERT INTO users (id, username) VALUES (:id, :username)"),
+                           [{"id": u, "username": f"user{u}"} for u in users])
+        tables = [{"id": u * TABLES_PER_USER + t, "userid": u, "table_name": f"t{t}"}
+                  for u in users for t in range(TABLES_PER_USER)]
+        await conn.execute(text("INSERT INTO tables (id, userid, table_name) VALUES (:id, :userid, :table_name)"),
+                           tables)
+        await conn.execute(
+            text("INSERT INTO columns (table_id, column_name, type) VALUES (:table_id, :column_name, 'TEXT')"),
+            [{"table_id": table["id"], "column_name": f"c{c}"} for table in tables for c in range(COLUMNS_PER_TABLE)]
+        )
+        insert_cell = text("INSERT INTO data (row_id, column_id, data) VALUES (:row_id, :column_id, :data)")
+        batch = []
+        for row_id in range(1, cells // COLUMNS_PER_TABLE + 1):
+            for column_id in range(1, COLUMNS_PER_TABLE + 1):
+                batch.append({"row_id": row_id, "column_id": column_id,
+                              "data": f"{NAMES[(row_id + column_id) % len(NAMES)]} {row_id}"})
+            if len(batch) >= 50_000:
+                await conn.execute(insert_cell, batch)
+                batch = []
+        if batch:
+            await conn.execute(insert_cell, batch)
+
+
+async def plans(conn) -> dict:
+    result = {}
+    for name, query in QUERIES.items():
+        rows = await conn.execute(text("EXPLAIN QUERY PLAN " + query))
+        result[name] = "; ".join(row[3] for row in rows)
+    return result
+
+
+async def timings(conn) -> dict:
+    result = {}
+    for name, query in QUERIES.items():
+        started = time.perf_counter()
+        for _ in range(20):
+            await conn.execute(text(query))
+        result[name] = (time.perf_counter() - started) / 20 * 1000
+    return result
+
+
+async def main():
+    cells = int(sys.argv[1]) if len(sys.argv) > 1 else CELLS
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        await baseline(engine, cells)
+        async with engine.connect() as conn:
+            before, before_ms = await plans(conn), await timings(conn)
+        await Migration.up(engine)
+        async with engine.connect() as conn:
+            after, after_ms = await plans(conn), await timings(conn)
+        await engine.dispose()
+
+    for name in QUERIES:
+        print(f"{name}:")
+        print(f"  before {before_ms[name]:7.2f} ms  {before[name]}")
+        print(f"  after  {after_ms[name]:7.2f} ms  {after[name]}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
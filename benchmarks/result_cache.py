@@ -0,0 +1,80 @@
+"""Repeated read-only questions: full agent turn vs the result cache.
+
+A scripted fake model reads the table with table_read, ends the task and
+writes a report, DELAY per generation. "Измени" requests make it call
+data_update instead, which must invalidate the cached answers.
+
+Run from the repository root: python -m benchmarks.result_cache
+"""
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+TMP = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(TMP, 'bench.db')}"
+
+from ai import AIHandler  # noqa: E402
+from benchmarks.fake_ollama import FakeOllama  # noqa: E402
+from crud import CRUD  # noqa: E402
+from db_config import Users, Tables, Columns, Migration, engine, async_session_maker  # noqa: E402
+from llm import LLMPool  # noqa: E402
+
+DELAY = 0.3
+QUESTION = "Что сейчас лежит в таблице заказов?"
+
+
+def scripted_model(body: dict) -> dict:
+    if not body.get("tools"):
+        seen = any("999" in (m.get("content") or "") for m in body["messages"][1:])
+        return {"content": "Отчёт: есть сумма 999." if seen else "Отчёт: суммы от 0 до 9."}
+    if "автоматически" in body["messages"][-1]["content"]:
+        return {"tool_calls": [{"function": {"name": "task_end", "arguments": {}}}]}
+    request = next(m["content"] for m in reversed(body["messages"]) if m["role"] == "user")
+    if request.startswith("Измени"):
+        call = {"name": "data_update", "arguments": {"record_id": 1, "column_id": 1, "data": "999"}}
+    else:
+        call = {"name": "table_read", "arguments": {"table_id": 1}}
+    return {"tool_calls": [{"function": call}]}
+
+
+async def ask(handler: AIHandler, server: FakeOllama, query: str):
+    server.requests.clear()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        answer = await handler.handle_query(query, 1)
+    return answer, len(server.requests), time.perf_counter() - started
+
+
+async def main():
+    server = FakeOllama(delay=DELAY, script=scripted_model)
+    AIHandler.ai = LLMPool(server.start())
+    await Migration.up(engine)
+    async with async_session_maker() as session:
+        session.add(Users(id=1, username="bench", context={}))
+        session.add(Tables(id=1, userid=1, table_name="Заказы"))
+        session.add(Columns(id=1, table_id=1, column_name="Сумма", type="INTEGER"))
+        await session.commit()
+        await CRUD(session).bulk_insert_rows(1, [{"Сумма": i} for i in range(10)], 1)
+    try:
+        handler = AIHandler()
+        steps = [("first ask", QUESTION), ("repeat", QUESTION), ("repeat, reworded case", QUESTION.upper()),
+                 ("write", "Измени первую сумму на 999"), ("after write", QUESTION), ("repeat", QUESTION)]
+        results = [(name, *await ask(handler, server, query)) for name, query in steps]
+    finally:
+        server.stop()
+        await engine.dispose()
+    print(f"fake model: {DELAY * 1000:.0f} ms per generation")
+    print(f"{'step':<24}{'generations':>12}{'ms':>10}")
+    for name, answer, generations, elapsed in results:
+        print(f"{name:<24}{generations:>12}{elapsed * 1000:>10.1f}")
+    assert results[1][2] == 0 and results[4][2] > 0 and results[5][2] == 0
+    assert "999" in results[4][1] and "999" not in results[0][1]
+    print(f"result cache: {handler.result_cache.hits} hits, {handler.result_cache.misses} misses, "
+          f"{handler.result_cache.bytes} bytes")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
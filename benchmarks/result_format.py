@@ -0,0 +1,29 @@
+"""Size of a tool result seen by the model: str(list_of_dicts) vs ResultPager.
+
+Run from the repository root: python -m benchmarks.result_format
+"""
+import time
+
+from formatter import ResultPager
+from memory import estimate_tokens
+
+SIZES = (10, 100, 1_000, 10_000)
+
+
+def main():
+    pager = ResultPager()
+    print(f"per-result cap: {pager.max_tokens} tokens")
+    print(f"{'records':>8}{'str() tokens':>14}{'compact (all)':>15}{'first page':>12}{'format, ms':>12}")
+    for size in SIZES:
+        records = [{"row_id": i, "column_id": 3, "data": f"Клиент {i}, Москва"} for i in range(size)]
+        legacy = estimate_tokens(str(records))
+        compact = estimate_tokens(ResultPager(max_tokens=10 ** 9).records(records, 1))
+        started = time.perf_counter()
+        page = pager.records(records, 1)
+        elapsed = (time.perf_counter() - started) * 1000
+        assert estimate_tokens(page) <= pager.max_tokens
+        print(f"{size:>8}{legacy:>14}{compact:>15}{estimate_tokens(page):>12}{elapsed:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
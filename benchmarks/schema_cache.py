@@ -0,0 +1,93 @@
+"""LLM iterations per task with and without the schema catalog in the prompt.
+
+A scripted fake model behaves like the real one: when the system prompt
+already lists the user's tables and column ids it acts directly, otherwise
+it first looks the ids up with list_records / list_records_with_filters.
+
+Run from the repository root: python -m benchmarks.schema_cache [tasks]
+"""
+import asyncio
+import contextlib
+import io
+import os
+import re
+import sys
+import tempfile
+import time
+
+TMP = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(TMP, 'bench.db')}"
+
+from ai import AIHandler  # noqa: E402
+from benchmarks.fake_ollama import FakeOllama  # noqa: E402
+from db_config import Users, Tables, Columns, Migration, engine, async_session_maker  # noqa: E402
+from llm import LLMPool  # noqa: E402
+
+TASKS = 20
+
+
+def call(name, **arguments):
+    return {"tool_calls": [{"function": {"name": name, "arguments": arguments}}]}
+
+
+def scripted_model(body: dict) -> dict:
+    if "tools" not in body or not body["tools"]:
+        return {"content": "Готово."}
+    text = "\n".join(message.get("content") or "" for message in body["messages"])
+    if "rows_insert: Добавлено" in text:
+        return call("task_end")
+    known = re.search(r"Clients\[id=(\d+)\]: Имя\[id=(\d+)", text)
+    if known:
+        return call("rows_insert", table_id=int(known.group(1)), rows=[{"Имя": "Влад"}])
+    table = re.search(r"^(\d+) \| \d+ \| Clients$", text, re.MULTILINE)
+    if not table:
+        return call("list_records", model="Tables")
+    column = re.search(r"^(\d+) \| \d+ \| Имя \|", text, re.MULTILINE)
+    if not column:
+        return call("list_records_with_filters", model="Columns", filters={"table_id": {"eq": int(table.group(1))}})
+    return call("rows_insert", table_id=int(table.group(1)), rows=[{"Имя": "Влад"}])
+
+
+async def run(handler: AIHandler, server: FakeOllama, tasks: int):
+    server.requests.clear()
+    started = time.perf_counter()
+    for _ in range(tasks):
+        with contextlib.redirect_stdout(io.StringIO()):
+            await handler.handle_query("Добавь клиента Влад в таблицу Clients", 1)
+        await handler._set_user_context(1, {"history": []})
+    return len(server.requests) / tasks, (time.perf_counter() - started) / tasks
+
+
+async def main():
+    tasks = int(sys.argv[1]) if len(sys.argv) > 1 else TASKS
+    server = FakeOllama(delay=0.02, script=scripted_model)
+    AIHandler.ai = LLMPool(server.start())
+    await Migration.up(engine)
+    async with async_session_maker() as session:
+        session.add(Users(id=1, username="bench", context={}))
+        session.add(Tables(id=1, userid=1, table_name="Clients"))
+        session.add(Columns(id=1, table_id=1, column_name="Имя", type="TEXT"))
+        await session.commit()
+    try:
+        handler = AIHandler()
+        with_cache = await run(handler, server, tasks)
+        cache = handler.schema_cache
+
+        async def no_schema(user_id):
+            return ""
+
+        handler.schema_cache = type(cache)()
+        handler.schema_cache.describe = no_schema
+        without_cache = await run(handler, server, tasks)
+    finally:
+        server.stop()
+        await engine.dispose()
+
+    print(f"{tasks} tasks 'add a row to Clients'")
+    print(f"without schema in prompt: {without_cache[0]:.1f} LLM calls/task, {without_cache[1] * 1000:.0f} ms/task")
+    print(f"with schema cache:        {with_cache[0]:.1f} LLM calls/task, {with_cache[1] * 1000:.0f} ms/task")
+    print(f"schema cache: hits={cache.hits} misses={cache.misses} hit rate={cache.hit_rate:.0%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
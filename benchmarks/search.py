@@ -0,0 +1,61 @@
+"""data_search over the FTS5 index vs a substring scan of every cell.
+
+Run from the repository root: python -m benchmarks.search [cells ...]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import update, delete
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from benchmarks.list_filters import fill
+from crud import CRUD
+from db_config import Data, Migration
+
+SIZES = (100_000, 1_000_000)
+
+
+async def bench(cells: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        started = time.perf_counter()
+        await fill(engine, cells)
+        fill_time = time.perf_counter() - started
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_maker() as session:
+            crud = CRUD(session)
+            started = time.perf_counter()
+            scan = await crud.list_filtered(Data, {"data": {"like": "Влад 4242"}}, 1)
+            scan_time = time.perf_counter() - started
+            started = time.perf_counter()
+            hits = await crud.search("Влад 4242", 1)
+            search_time = time.perf_counter() - started
+            assert any(hit["row_id"] == 4242 for hit in hits), hits
+
+            await session.execute(update(Data).where(Data.row_id == 7, Data.column_id == 1).values(data="Уникальный"))
+            await session.commit()
+            assert [hit["row_id"] for hit in await crud.search("уникальный", 1)] == [7]
+            await session.execute(delete(Data).where(Data.row_id == 7, Data.column_id == 1))
+            await session.commit()
+            assert await crud.search("уникальный", 1) == []
+
+        started = time.perf_counter()
+        await Migration.rebuild_search_index(engine)
+        rebuild_time = time.perf_counter() - started
+        await engine.dispose()
+    print(f"{cells:>10}{fill_time:>10.1f}{scan_time * 1000:>10.1f}{search_time * 1000:>12.1f}{rebuild_time:>12.1f}")
+    print(f"{'':>10}top hit: {hits[0]}")
+
+
+async def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(f"{'cells':>10}{'fill, s':>10}{'scan, ms':>10}{'search, ms':>12}{'rebuild, s':>12}")
+    for cells in sizes:
+        await bench(cells)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""Time to first visible token of a report: one reply after generation vs streamed edits.
+
+A scripted fake model ends the task with task_end and then writes a report
+of REPORT_TOKENS tokens, preceded by a <think> block, at TOKEN_DELAY per token.
+The fake Telegram message records when the user first sees text.
+
+Run from the repository root: python -m benchmarks.streaming
+"""
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+TMP = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(TMP, 'bench.db')}"
+
+from ai import AIHandler  # noqa: E402
+from benchmarks.fake_ollama import FakeOllama  # noqa: E402
+from db_config import Users, Migration, engine, async_session_maker  # noqa: E402
+from llm import LLMPool  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+from streaming import ReplyStreamer, ThinkFilter, first_token  # noqa: E402
+
+THINK_TOKENS = 60
+REPORT_TOKENS = 200
+TOKEN_DELAY = 0.005
+REPORT = ("<think> " + "размышление " * THINK_TOKENS + "</think> "
+          + " ".join(f"строка{i}" for i in range(REPORT_TOKENS)))
+
+
+def scripted_model(body: dict) -> dict:
+    if body.get("tools"):
+        return {"tool_calls": [{"function": {"name": "task_end", "arguments": {}}}]}
+    return {"content": REPORT}
+
+
+class FakeMessage:
+    def __init__(self, started: float):
+        self.started = started
+        self.first_seen = None
+        self.edits = 0
+        self.text = ""
+
+    async def reply(self, text: str, parse_mode=None):
+        self.first_seen = self.first_seen or time.perf_counter() - self.started
+        self.text = text
+        await asyncio.sleep(0.03)
+        return self
+
+    async def edit_text(self, text: str, parse_mode=None):
+        self.edits += 1
+        self.text = text
+        await asyncio.sleep(0.03)
+
+
+async def run(handler: AIHandler, stream: bool):
+    handler.result_cache = ResultCache()
+    message = FakeMessage(time.perf_counter())
+    streamer = ReplyStreamer(message, interval=0.2)
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = await handler.handle_query("Отчёт", 1, on_text=streamer.update if stream else None)
+    await streamer.finish(response)
+    return message, time.perf_counter() - message.started
+
+
+async def main():
+    think = ThinkFilter()
+    for char in "a<thi" + "nk>hidden</th" + "ink>b<t":
+        think.feed(char)
+    assert think.close() == "ab<t"
+
+    server = FakeOllama(delay=0.05, script=scripted_model, token_delay=TOKEN_DELAY)
+    AIHandler.ai = LLMPool(server.start())
+    await Migration.up(engine)
+    async with async_session_maker() as session:
+        session.add(Users(id=1, username="bench", context={}))
+        await session.commit()
+    try:
+        handler = AIHandler()
+        results = [(name, *await run(handler, stream)) for name, stream in (("reply", False), ("stream", True))]
+    finally:
+        server.stop()
+        await engine.dispose()
+    print(f"report: {THINK_TOKENS} thinking + {REPORT_TOKENS} visible tokens, {TOKEN_DELAY * 1000:.0f} ms/token")
+    print(f"{'mode':<8}{'first text, ms':>16}{'complete, ms':>14}{'edits':>7}")
+    for name, message, total in results:
+        assert "размышление" not in message.text and message.text.endswith(f"строка{REPORT_TOKENS - 1}")
+        print(f"{name:<8}{message.first_seen * 1000:>16.0f}{total * 1000:>14.0f}{message.edits:>7}")
+    print(f"tracked time to first visible token: avg {first_token.average * 1000:.0f} ms over {first_token.count}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""Reading a whole table: one crud.get per cell vs a single pivot query.
+
+Run from the repository root: python -m benchmarks.table_read [rows] [columns]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from crud import CRUD
+from db_config import Users, Tables, Columns, Data, Migration, make_engine
+
+ROWS = 1_000
+COLUMNS = 10
+
+
+async def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else COLUMNS
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        await Migration.up(engine)
+        statements = []
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(1))
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_maker() as session:
+            session.add(Users(id=1, username="bench"))
+            session.add(Tables(id=1, userid=1, table_name="Wide"))
+            session.add_all([Columns(id=i, table_id=1, column_name=f"c{i}", type="TEXT") for i in range(1, width + 1)])
+            await session.commit()
+            crud = CRUD(session)
+            await crud.bulk_insert_rows(1, [{f"c{i}": f"{r}:{i}" for i in range(1, width + 1)} for r in range(rows)], 1)
+
+            statements.clear()
+            started = time.perf_counter()
+            cells = [await crud.get(Data, r, user_id=1, column_id=i)
+                     for r in range(1, rows + 1) for i in range(1, width + 1)]
+            per_cell = time.perf_counter() - started
+            per_cell_statements = len(statements)
+
+            statements.clear()
+            started = time.perf_counter()
+            table = await crud.read_table(1, 1, limit=rows)
+            pivot = time.perf_counter() - started
+            pivot_statements = len(statements)
+        await engine.dispose()
+
+    assert len(table) == rows and table[-1][f"c{width}"] == cells[-1]["data"]
+    print(f"{rows} rows x {width} columns")
+    print(f"data_get per cell: {per_cell_statements} statements, {per_cell * 1000:.0f} ms")
+    print(f"table_read:        {pivot_statements} statements, {pivot * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""One LLM turn with many read-only tool calls: serial vs concurrent.
+
+SQLite work only overlaps on a multi-core host, so the second scenario adds
+a fixed simulated I/O wait to every call to show the scheduling on its own.
+
+Run from the repository root: python -m benchmarks.tool_fanout [calls] [rows]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+TMP = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(TMP, 'bench.db')}"
+
+from ai import AIHandler  # noqa: E402
+from crud import CRUD  # noqa: E402
+from db_config import Users, Tables, Columns, Migration, engine, async_session_maker  # noqa: E402
+
+CALLS = 15
+ROWS = 20_000
+IO_WAIT = 0.02
+
+
+async def measure(handler: AIHandler, turn):
+    started = time.perf_counter()
+    serial = [await handler._tools_calling(name, 1, arguments) for name, arguments in turn]
+    serial_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    concurrent = await handler._run_tool_calls(turn, 1)
+    concurrent_time = time.perf_counter() - started
+    assert serial == concurrent
+    return serial_time, concurrent_time
+
+
+async def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else CALLS
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else ROWS
+    await Migration.up(engine)
+    async with async_session_maker() as session:
+        session.add(Users(id=1, username="bench"))
+        session.add(Tables(id=1, userid=1, table_name="Orders"))
+        session.add_all([Columns(id=i, table_id=1, column_name=f"c{i}", type="INTEGER") for i in range(1, 6)])
+        await session.commit()
+        await CRUD(session).bulk_insert_rows(1, [{f"c{i}": r * i for i in range(1, 6)} for r in range(rows)], 1)
+
+    handler = AIHandler()
+    turn = [("data_aggregate", {"column_id": 1 + n % 5, "function": "avg", "group_by_column_id": 1 + (n + 1) % 5})
+            if n % 2 else ("list_records_with_filters", {"model": "Data", "filters": {"data": {"like": str(n)}}})
+            for n in range(calls)]
+
+    await handler._run_tool_calls(turn, 1)
+    single = []
+    for name, arguments in turn:
+        started = time.perf_counter()
+        await handler._tools_calling(name, 1, arguments)
+        single.append(time.perf_counter() - started)
+
+    serial_time, concurrent_time = await measure(handler, turn)
+
+    tools_calling = handler._tools_calling
+
+    async def with_io_wait(name, user_id, arguments):
+        await asyncio.sleep(IO_WAIT)
+        return await tools_calling(name, user_id, arguments)
+
+    handler._tools_calling = with_io_wait
+    serial_io, concurrent_io = await measure(handler, turn)
+    await engine.dispose()
+
+    print(f"{calls} read-only calls in one turn, {rows} rows x 5 columns, {os.cpu_count()} CPU(s)")
+    print(f"slowest single call: {max(single) * 1000:.0f} ms")
+    print(f"{'':<24}{'serial, ms':>12}{'concurrent, ms':>16}")
+    print(f"{'database only':<24}{serial_time * 1000:>12.0f}{concurrent_time * 1000:>16.0f}")
+    print(f"{f'+{IO_WAIT * 1000:.0f} ms I/O per call':<24}{serial_io * 1000:>12.0f}{concurrent_io * 1000:>16.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
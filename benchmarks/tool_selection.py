@@ -0,0 +1,90 @@
+"""Prompt size per tool-loop iteration: all tool schemas vs the per-request subset.
+
+Every request runs two iterations against a scripted fake model: table_read,
+then task_end. The fake charges PREFILL per prompt token, so prefill time
+follows the prompt size. The selection rate is the share of requests that got
+a subset rather than every tool; phrasings with nouns that end like Russian
+imperatives ("по имени", "были", "людей") must still get one.
+
+Run from the repository root: python -m benchmarks.tool_selection
+"""
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+
+TMP = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(TMP, 'bench.db')}"
+
+from ai import AIHandler  # noqa: E402
+from benchmarks.fake_ollama import FakeOllama  # noqa: E402
+from db_config import Users, Tables, Columns, Migration, engine, async_session_maker  # noqa: E402
+from llm import LLMPool  # noqa: E402
+
+PREFILL = 0.0001
+REQUESTS = [
+    "Создай таблицу Поставщики", "Добавь клиента Иван из Москвы", "Измени город клиента 3 на Казань",
+    "Удали клиента Пётр", "Найди клиентов из Москвы", "Сколько клиентов в каждом городе?",
+    "Какая средняя сумма заказа?", "Переименуй колонку Город в Адрес", "Привет, что ты умеешь?",
+    "Выведи первые 10 клиентов по алфавиту", "Найди клиентов по имени Влад", "Найди всех людей из Москвы",
+    "Найди заказы, которые были оплачены", "Найди Влада и поставь ему возраст 30",
+]
+NEEDS_ALL = {"Привет, что ты умеешь?", "Выведи первые 10 клиентов по алфавиту", "Найди Влада и поставь ему возраст 30"}
+
+
+def scripted_model(body: dict) -> dict:
+    if not body.get("tools"):
+        return {"content": "Готово."}
+    if "автоматически" in body["messages"][-1]["content"]:
+        return {"tool_calls": [{"function": {"name": "task_end", "arguments": {}}}]}
+    return {"tool_calls": [{"function": {"name": "table_read", "arguments": {"table_id": 1, "limit": 5}}}]}
+
+
+async def run(handler: AIHandler, server: FakeOllama):
+    server.requests.clear()
+    selected = set()
+    for i, query in enumerate(REQUESTS):
+        start = len(server.requests)
+        with contextlib.redirect_stdout(io.StringIO()):
+            await handler.handle_query(query, i + 1)
+        if len(server.requests[start]["tools"]) < len(handler.registry.names):
+            selected.add(query)
+    iterations = [body for body in server.requests if body.get("tools")]
+    tokens = [FakeOllama.prompt_tokens(body) for body in iterations]
+    tool_tokens = [handler.registry.tokens(body["tools"]) for body in iterations]
+    return len(iterations), sum(tokens) / len(tokens), sum(tool_tokens) / len(tool_tokens), selected
+
+
+async def main():
+    server = FakeOllama(delay=0.0, script=scripted_model, prefill_per_token=PREFILL)
+    AIHandler.ai = LLMPool(server.start(), max_concurrency=1)
+    await Migration.up(engine)
+    async with async_session_maker() as session:
+        for user_id in range(1, len(REQUESTS) + 1):
+            session.add(Users(id=user_id, username=f"bench{user_id}", context={}))
+            session.add(Tables(id=user_id, userid=user_id, table_name="Клиенты"))
+            session.add_all([Columns(table_id=user_id, column_name=name, type="TEXT") for name in ("Имя", "Город")])
+        await session.commit()
+    try:
+        handler = AIHandler()
+        select = handler.registry.select
+        handler.registry.select = lambda *args, **kwargs: handler.registry.schemas(handler.registry.names)
+        full = await run(handler, server)
+        handler.registry.select = select
+        handler.result_cache = type(handler.result_cache)()
+        subset = await run(handler, server)
+    finally:
+        server.stop()
+        await engine.dispose()
+    print(f"{len(REQUESTS)} requests, {PREFILL * 1e6:.0f} us prefill per prompt token")
+    print(f"{'tools':<14}{'iterations':>11}{'prompt tokens':>15}{'tool tokens':>13}{'prefill ms':>12}"
+          f"{'selection rate':>16}")
+    for name, (iterations, tokens, tool_tokens, selected) in (("all", full), ("selected", subset)):
+        print(f"{name:<14}{iterations:>11}{tokens:>15.0f}{tool_tokens:>13.0f}{tokens * PREFILL * 1000:>12.0f}"
+              f"{len(selected) / len(REQUESTS):>16.0%}")
+    assert subset[3] == set(REQUESTS) - NEEDS_ALL, sorted(set(REQUESTS) - NEEDS_ALL - subset[3])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
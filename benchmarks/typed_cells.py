@@ -0,0 +1,74 @@
+"""Numeric range filters and sorts on typed shadow columns.
+
+Fills an INTEGER column, checks that gt/lt and ORDER BY follow numeric order
+(the old string comparison put "100" before "9"), shows the query plan and
+re-types a TEXT column through CRUD.update.
+
+Run from the repository root: python -m benchmarks.typed_cells [rows]
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from crud import CRUD
+from db_config import Users, Tables, Columns, Data, Migration, make_engine
+
+ROWS = 100_000
+
+
+async def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    prices = [random.randint(1, 100_000) for _ in range(rows)]
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        await Migration.up(engine)
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_maker() as session:
+            session.add(Users(id=1, username="bench"))
+            session.add(Tables(id=1, userid=1, table_name="Goods"))
+            session.add_all([
+                Columns(id=1, table_id=1, column_name="Price", type="INTEGER"),
+                Columns(id=2, table_id=1, column_name="Amount", type="TEXT"),
+            ])
+            await session.commit()
+            crud = CRUD(session)
+            await crud.bulk_insert_rows(1, [{"Price": p, "Amount": str(p % 97)} for p in prices], 1)
+
+            started = time.perf_counter()
+            found = await crud.list_filtered(Data, {"column_id": {"eq": 1}, "data": {"gt": 99_000}}, 1)
+            range_ms = (time.perf_counter() - started) * 1000
+            expected = sum(1 for p in prices if p > 99_000)
+            assert len(found) == expected, (len(found), expected)
+
+            started = time.perf_counter()
+            top = await crud.list_filtered(Data, {"column_id": {"eq": 1}}, 1, limit=10, order_by="-data")
+            sort_ms = (time.perf_counter() - started) * 1000
+            assert [int(r["data"]) for r in top] == sorted(prices, reverse=True)[:10]
+
+            legacy = sum(1 for p in prices if str(p) > "99000")
+            print(f"{rows} rows, data > 99000: {expected} numeric matches (string compare gave {legacy})")
+            print(f"range filter: {range_ms:.1f} ms, top-10 by price: {sort_ms:.1f} ms")
+
+            plan = await session.execute(text(
+                "EXPLAIN QUERY PLAN SELECT row_id FROM data WHERE column_id = 1 AND num_value > 99000 "
+                "ORDER BY num_value DESC LIMIT 10"
+            ))
+            print("plan:", "; ".join(row[3] for row in plan))
+
+            started = time.perf_counter()
+            await crud.update(Columns, 2, {"type": "INTEGER"}, user_id=1)
+            retype_ms = (time.perf_counter() - started) * 1000
+            result = await session.execute(select(Data.data, Data.num_value).where(Data.column_id == 2).limit(1000))
+            assert all(float(data) == number for data, number in result.all())
+            print(f"TEXT -> INTEGER conversion of {rows} cells: {retype_ms:.0f} ms")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""Bursty users: one agent loop per message vs the per-user UserQueue.
+
+Each user sends a burst of messages 50 ms apart. An agent turn is three
+generations on a fake model shared through one LLMPool, like a short tool loop.
+
+Run from the repository root: python -m benchmarks.user_queue [users] [burst]
+"""
+import asyncio
+import sys
+import time
+from collections import Counter
+
+from benchmarks.fake_ollama import FakeOllama
+from llm import LLMPool
+from user_queue import UserQueue
+
+USERS = 10
+BURST = 5
+GENERATIONS = 3
+
+
+class Agent:
+    def __init__(self, llm: LLMPool):
+        self.llm = llm
+        self.active = Counter()
+        self.overlap = 0
+        self.turns = 0
+        self.answered = {}
+
+    async def turn(self, user_id: int, batch: list):
+        self.active[user_id] += 1
+        self.overlap = max(self.overlap, self.active[user_id])
+        self.turns += 1
+        try:
+            for _ in range(GENERATIONS):
+                await self.llm.chat(model="fake", messages=[{"role": "user", "content": "\n".join(batch)}])
+        finally:
+            self.active[user_id] -= 1
+        self.answered[user_id] = time.perf_counter()
+
+
+async def burst(submit, users: int, size: int):
+    async def user(user_id: int):
+        for i in range(size):
+            await submit(user_id, f"сообщение {i}")
+            await asyncio.sleep(0.05)
+    await asyncio.gather(*(user(u) for u in range(users)))
+
+
+async def run(host: str, queued: bool, users: int, size: int):
+    agent = Agent(LLMPool(host, max_concurrency=4, max_queue=1000))
+    tasks, rejected = [], 0
+    queue = UserQueue(agent.turn, max_depth=3)
+
+    async def submit(user_id: int, text: str):
+        nonlocal rejected
+        if not queued:
+            tasks.append(asyncio.create_task(agent.turn(user_id, [text])))
+        elif not queue.submit(user_id, text):
+            rejected += 1
+
+    started = time.perf_counter()
+    await burst(submit, users, size)
+    await asyncio.gather(*tasks)
+    await queue.drain()
+    last_answer = max(agent.answered.values()) - started
+    return agent.turns, agent.turns * GENERATIONS, agent.overlap, rejected, last_answer
+
+
+async def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else USERS
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else BURST
+    server = FakeOllama(delay=0.05, parallel=4)
+    host = server.start()
+    try:
+        results = [(name, await run(host, queued, users, size)) for name, queued in (("per message", False),
+                                                                                     ("user queue", True))]
+    finally:
+        server.stop()
+    print(f"{users} users x {size} messages, {GENERATIONS} generations per turn, 4 model slots")
+    print(f"{'mode':<13}{'turns':>7}{'generations':>13}{'max turns/user':>16}{'rejected':>10}{'done, ms':>10}")
+    for name, (turns, generations, overlap, rejected, elapsed) in results:
+        print(f"{name:<13}{turns:>7}{generations:>13}{overlap:>16}{rejected:>10}{elapsed * 1000:>10.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
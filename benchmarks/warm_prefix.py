@@ -0,0 +1,142 @@
+"""Cold starts and per-iteration prefill with warm-up, keep_alive and a stable prompt prefix.
+
+Cold start: the fake server takes LOAD seconds to load a model and unloads
+it IDLE_UNLOAD seconds after the last request, unless keep_alive says
+otherwise. A user asks once, goes idle, then asks again.
+- before: no warm-up, no keep_alive.
+- after: warm-up at startup, keep_alive="30m".
+
+Prefill: the fake keeps the last prompt of each model and charges prefill
+only for tokens after the common prefix, like Ollama's KV cache reuse.
+The user already has a conversation history near the memory budget.
+Three create-table turns are recorded with the new layout. In it, the catalog
+message stays fixed for the whole turn and schema changes are appended to the
+tool output, and the tool list, which templates put first, does not change
+between iterations. The turns are then replayed the old way, which rewrites the
+catalog message in place before every iteration.
+
+Run from the repository root: python -m benchmarks.warm_prefix
+"""
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+TMP = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(TMP, 'bench.db')}"
+
+from ai import AIHandler  # noqa: E402
+from benchmarks.fake_ollama import FakeOllama  # noqa: E402
+from db_config import Users, Migration, engine, async_session_maker  # noqa: E402
+from llm import LLMPool  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+
+LOAD = 1.5
+IDLE_UNLOAD = 0.5
+IDLE = 0.8
+PREFILL = 0.0001
+UPDATE = "\n\nОбновлённый список таблиц:\n"
+HISTORY = [{"role": role, "content": f"Сообщение {i}: " + "обсуждение структуры таблиц и данных " * 8}
+           for i, role in enumerate(["user", "assistant"] * 6)]
+
+
+def call(name, **arguments):
+    return {"function": {"name": name, "arguments": arguments}}
+
+
+def scripted_model(body: dict) -> dict:
+    if not body.get("tools"):
+        return {"content": "Готово."}
+    last = body["messages"][-1]["content"]
+    if "Таблица создана с ID: " in last:
+        table_id = int(last.split("Таблица создана с ID: ")[1].split()[0])
+        return {"tool_calls": [call("columns_create", table_id=table_id, column_name=name, type="TEXT")
+                               for name in ("Имя", "Город", "Телефон")]}
+    if "Колонка создана" in last:
+        return {"tool_calls": [call("task_end")]}
+    return {"tool_calls": [call("tables_create", table_name=last.split()[-1])]}
+
+
+async def ask(handler: AIHandler, query: str) -> float:
+    handler.result_cache = ResultCache()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        await handler.handle_query(query, 1)
+    return time.perf_counter() - started
+
+
+async def cold_start(keep_alive, warm: bool):
+    server = FakeOllama(delay=0.05, script=scripted_model, load_time=LOAD, default_keep_alive=IDLE_UNLOAD)
+    AIHandler.ai = LLMPool(server.start(), keep_alive=keep_alive)
+    try:
+        handler = AIHandler()
+        if warm:
+            await handler.warm_up()
+        first = await ask(handler, f"Создай таблицу Первая{int(warm)}")
+        await asyncio.sleep(IDLE)
+        second = await ask(handler, f"Создай таблицу Вторая{int(warm)}")
+    finally:
+        server.stop()
+    return first, second, server.loads
+
+
+def old_layout(body: dict) -> dict:
+    messages = [dict(message) for message in body["messages"]]
+    for message in messages[2:]:
+        if UPDATE in (message.get("content") or ""):
+            message["content"], messages[1]["content"] = message["content"].split(UPDATE)
+    return {**body, "messages": messages}
+
+
+async def prefill():
+    server = FakeOllama(delay=0.0, script=scripted_model, prefix_cache=True, prefill_per_token=PREFILL)
+    AIHandler.ai = LLMPool(server.start())
+    try:
+        handler = AIHandler()
+        await handler._set_user_context(1, {"history": HISTORY})
+        for name in ("Клиенты", "Заказы", "Товары"):
+            await ask(handler, f"Создай таблицу {name}")
+    finally:
+        server.stop()
+    loop = [i for i, body in enumerate(server.requests) if body.get("tools")]
+    turn_tools = None
+    for body in server.requests:
+        if not body.get("tools"):
+            turn_tools = None
+            continue
+        turn_tools = turn_tools or body["tools"]
+        assert body["tools"] == turn_tools, "tool list changed inside a turn and invalidated the prompt prefix"
+    after = [server.uncached[i] for i in loop]
+    replay = FakeOllama(prefix_cache=True)
+    before = [tokens for i, body in enumerate(server.requests)
+              for tokens in [replay._uncached_tokens(old_layout(body))] if i in loop]
+    full = [FakeOllama.prompt_tokens(server.requests[i]) for i in loop]
+    return full, before, after
+
+
+async def main():
+    await Migration.up(engine)
+    async with async_session_maker() as session:
+        session.add(Users(id=1, username="bench", context={}))
+        await session.commit()
+    try:
+        cold = [("before", *await cold_start(None, False)), ("after", *await cold_start("30m", True))]
+        full, before, after = await prefill()
+    finally:
+        await engine.dispose()
+    print(f"model load {LOAD * 1000:.0f} ms, server unloads after {IDLE_UNLOAD * 1000:.0f} ms idle, "
+          f"user idles {IDLE * 1000:.0f} ms")
+    print(f"{'':<8}{'first request, ms':>19}{'after idle, ms':>16}{'model loads':>13}")
+    for name, first, second, loads in cold:
+        print(f"{name:<8}{first * 1000:>19.0f}{second * 1000:>16.0f}{loads:>13}")
+    print(f"\n{len(after)} loop iterations over 3 turns, {PREFILL * 1e6:.0f} us prefill per token")
+    print(f"{'':<8}{'prompt tokens':>15}{'uncached tokens':>17}{'prefill ms/iteration':>22}")
+    for name, tokens in (("before", before), ("after", after)):
+        print(f"{name:<8}{sum(full) / len(full):>15.0f}{sum(tokens) / len(tokens):>17.0f}"
+              f"{sum(tokens) / len(tokens) * PREFILL * 1000:>22.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
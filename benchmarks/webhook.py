@@ -0,0 +1,182 @@
+"""Update delivery: long polling vs the webhook endpoint.
+
+Updates "arrive at Telegram" at a steady RATE per second, and then all at
+once as a burst. Every hop has LATENCY of one-way network delay.
+
+- Polling: a fake Bot API holds getUpdates open until something has arrived.
+- Webhook: a fake sender posts each update to build_webhook_app() over at
+  most MAX_CONNECTIONS connections, the same way Telegram does.
+
+The dispatcher only records the delay from arrival to handler, so this
+measures the transport and not the agent.
+
+Run from the repository root: python -m benchmarks.webhook [updates]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import aiohttp
+from aiohttp import web
+
+TMP = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(TMP, 'bench.db')}"
+
+from aiogram import Bot, Dispatcher  # noqa: E402
+from aiogram.client.session.aiohttp import AiohttpSession  # noqa: E402
+from aiogram.client.telegram import TelegramAPIServer  # noqa: E402
+from aiogram.types import Message  # noqa: E402
+
+import config  # noqa: E402
+from main import build_webhook_app  # noqa: E402
+
+UPDATES = 1_000
+RATE = 200
+LATENCY = 0.03
+MAX_CONNECTIONS = 40
+TOKEN = "42:bench"
+
+
+def make_update(update_id: int, arrived: float) -> dict:
+    return {"update_id": update_id, "message": {
+        "message_id": update_id, "date": int(time.time()), "text": repr(arrived),
+        "chat": {"id": update_id % 50, "type": "private"},
+        "from": {"id": update_id % 50, "is_bot": False, "first_name": "bench"},
+    }}
+
+
+class Telegram:
+    def __init__(self, total: int, rate: float):
+        self.total = total
+        self.rate = rate
+        self.arrived = []
+        self.new = asyncio.Event()
+
+    async def feed(self):
+        started = time.perf_counter()
+        for update_id in range(1, self.total + 1):
+            if self.rate:
+                await asyncio.sleep(max(0.0, started + update_id / self.rate - time.perf_counter()))
+            self.arrived.append(make_update(update_id, time.perf_counter()))
+            self.new.set()
+
+
+class Counter:
+    def __init__(self, total: int):
+        self.total = total
+        self.latencies = []
+        self.done = asyncio.Event()
+        self.dispatcher = Dispatcher()
+        self.dispatcher.message.register(self.handle)
+
+    async def handle(self, message: Message):
+        self.latencies.append(time.perf_counter() - float(message.text))
+        if len(self.latencies) >= self.total:
+            self.done.set()
+
+
+class FakeBotAPI:
+    def __init__(self, telegram: Telegram):
+        self.telegram = telegram
+
+    async def handle(self, request: web.Request):
+        method = request.match_info["method"]
+        data = dict(await request.post())
+        await asyncio.sleep(LATENCY)
+        if method == "getMe":
+            result = {"id": 42, "is_bot": True, "first_name": "bench", "username": "bench_bot"}
+        elif method == "getUpdates":
+            offset, limit = int(data.get("offset") or 0), int(data.get("limit") or 100)
+            result = []
+            while not result:
+                result = [u for u in self.telegram.arrived if u["update_id"] >= offset][:limit]
+                if not result:
+                    self.telegram.new.clear()
+                    try:
+                        await asyncio.wait_for(self.telegram.new.wait(), float(data.get("timeout") or 1))
+                    except asyncio.TimeoutError:
+                        break
+        else:
+            result = True
+        await asyncio.sleep(LATENCY)
+        return web.json_response({"ok": True, "result": result})
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        self.runner = web.AppRunner(app, shutdown_timeout=2)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+        return f"http://127.0.0.1:{self.runner.addresses[0][1]}"
+
+
+async def polling(telegram: Telegram, counter: Counter):
+    api = FakeBotAPI(telegram)
+    bot = Bot(TOKEN, session=AiohttpSession(api=TelegramAPIServer.from_base(await api.start())))
+    task = asyncio.create_task(counter.dispatcher.start_polling(bot, handle_signals=False, polling_timeout=1))
+    await bot.get_me()
+    started = time.perf_counter()
+    await telegram.feed()
+    await counter.done.wait()
+    elapsed = time.perf_counter() - started
+    await counter.dispatcher.stop_polling()
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await api.runner.cleanup()
+    return elapsed
+
+
+async def webhook(telegram: Telegram, counter: Counter):
+    bot = Bot(TOKEN)
+    runner = web.AppRunner(build_webhook_app(bot, counter.dispatcher))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    url = f"http://127.0.0.1:{runner.addresses[0][1]}{config.WEBHOOK_PATH}"
+    headers = {"X-Telegram-Bot-Api-Secret-Token": config.WEBHOOK_SECRET} if config.WEBHOOK_SECRET else {}
+    connections = asyncio.Semaphore(MAX_CONNECTIONS)
+
+    async def deliver(session: aiohttp.ClientSession, update: dict):
+        async with connections:
+            await asyncio.sleep(LATENCY)
+            async with session.post(url, json=update, headers=headers) as response:
+                assert response.status == 200
+            await asyncio.sleep(LATENCY)
+
+    async def sender(session: aiohttp.ClientSession):
+        sent, deliveries = 0, []
+        while sent < telegram.total:
+            await telegram.new.wait()
+            telegram.new.clear()
+            deliveries += [asyncio.create_task(deliver(session, u)) for u in telegram.arrived[sent:]]
+            sent = len(telegram.arrived)
+        await asyncio.gather(*deliveries)
+
+    started = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(telegram.feed(), sender(session))
+    await counter.done.wait()
+    elapsed = time.perf_counter() - started
+    await bot.session.close()
+    await runner.cleanup()
+    return elapsed
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else UPDATES
+    print(f"{total} updates, {LATENCY * 1000:.0f} ms one-way latency, {MAX_CONNECTIONS} webhook connections")
+    print(f"{'mode':<9}{'arrival':>10}{'updates/s':>11}{'p50 delivery, ms':>18}{'p95, ms':>9}")
+    for rate in (RATE, 0):
+        for name, run in (("polling", polling), ("webhook", webhook)):
+            counter = Counter(total)
+            elapsed = await run(Telegram(total, rate), counter)
+            latencies = sorted(counter.latencies)
+            arrival = f"{rate}/s" if rate else "burst"
+            print(f"{name:<9}{arrival:>10}{total / elapsed:>11.0f}{statistics.median(latencies) * 1000:>18.0f}"
+                  f"{latencies[int(len(latencies) * 0.95)] * 1000:>9.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
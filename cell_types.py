@@ -0,0 +1,61 @@
+import math
+import re
+from datetime import datetime
+from typing import Optional
+
+NUMBER_TYPES = ("INT", "REAL", "FLOAT", "DOUBLE", "NUMERIC", "DECIMAL", "NUMBER", "MONEY", "ЧИСЛ", "ЦЕЛ", "ДЕНЕ")
+TIME_TYPES = ("DATE", "TIME", "ДАТ", "ВРЕМ")
+TIME_FORMATS = ("%d.%m.%Y", "%d.%m.%Y %H:%M", "%d.%m.%Y %H:%M:%S", "%d/%m/%Y", "%Y/%m/%d")
+
+
+def column_kind(column_type: Optional[str]) -> Optional[str]:
+    if not column_type:
+        return None
+    column_type = column_type.upper()
+    if any(name in column_type for name in TIME_TYPES):
+        return "time"
+    if any(name in column_type for name in NUMBER_TYPES):
+        return "number"
+    return None
+
+
+def to_number(value) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    elif isinstance(value, str):
+        cleaned = re.sub(r"[\s ]", "", value).replace(",", ".")
+        try:
+            number = float(cleaned)
+        except ValueError:
+            return None
+    else:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def to_time(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    for time_format in TIME_FORMATS:
+        try:
+            return datetime.strptime(value, time_format)
+        except ValueError:
+            continue
+    return None
+
+
+def typed_values(column_type: Optional[str], value) -> dict:
+    kind = column_kind(column_type)
+    return {
+        "num_value": to_number(value) if kind == "number" else None,
+        "time_value": to_time(value) if kind == "time" else None,
+    }
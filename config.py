@@ -0,0 +1,49 @@
+from os import getenv
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BOT_TOKEN = getenv("BOT_TOKEN")
+BOT_MODE = getenv("BOT_MODE", "polling")
+WEBHOOK_URL = getenv("WEBHOOK_URL", "")
+WEBHOOK_PATH = getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_HOST = getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_SECRET = getenv("WEBHOOK_SECRET") or None
+
+DATABASE_URL = getenv("DATABASE_URL", "sqlite+aiosqlite:///./test.db")
+DATABASE_ECHO = getenv("DATABASE_ECHO", "0") == "1"
+DATABASE_POOL_SIZE = int(getenv("DATABASE_POOL_SIZE", "10"))
+DATABASE_MAX_OVERFLOW = int(getenv("DATABASE_MAX_OVERFLOW", "10"))
+SQLITE_BUSY_TIMEOUT_MS = int(getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+OLLAMA_HOST = getenv("OLLAMA_HOST", "127.0.0.1:11434")
+OLLAMA_MODEL = getenv("OLLAMA_MODEL", "qwen3")
+OLLAMA_SMALL_MODEL = getenv("OLLAMA_SMALL_MODEL", "")
+OLLAMA_MAX_CONCURRENCY = int(getenv("OLLAMA_MAX_CONCURRENCY", "2"))
+OLLAMA_MAX_QUEUE = int(getenv("OLLAMA_MAX_QUEUE", "64"))
+OLLAMA_KEEP_ALIVE = getenv("OLLAMA_KEEP_ALIVE", "30m") or None
+if OLLAMA_KEEP_ALIVE and OLLAMA_KEEP_ALIVE.lstrip("-").isdigit():
+    OLLAMA_KEEP_ALIVE = int(OLLAMA_KEEP_ALIVE)
+
+TOOL_CONCURRENCY = int(getenv("TOOL_CONCURRENCY", "8"))
+TOOL_RESULT_TOKENS = int(getenv("TOOL_RESULT_TOKENS", "800"))
+AGENT_MODE = getenv("AGENT_MODE", "loop")
+
+MEMORY_TOKEN_BUDGET = int(getenv("MEMORY_TOKEN_BUDGET", "1500"))
+MEMORY_MESSAGE_TOKENS = int(getenv("MEMORY_MESSAGE_TOKENS", "300"))
+MEMORY_SUMMARY_TOKENS = int(getenv("MEMORY_SUMMARY_TOKENS", "300"))
+MEMORY_PENDING_TOKENS = int(getenv("MEMORY_PENDING_TOKENS", "3000"))
+
+CONTEXT_FLUSH_INTERVAL = float(getenv("CONTEXT_FLUSH_INTERVAL", "2"))
+CONTEXT_MAX_DIRTY = int(getenv("CONTEXT_MAX_DIRTY", "500"))
+CONTEXT_CACHE_SIZE = int(getenv("CONTEXT_CACHE_SIZE", "1000"))
+
+STREAM_EDIT_INTERVAL = float(getenv("STREAM_EDIT_INTERVAL", "1"))
+USER_QUEUE_DEPTH = int(getenv("USER_QUEUE_DEPTH", "3"))
+
+RESULT_CACHE_SIZE = int(getenv("RESULT_CACHE_SIZE", "1000"))
+RESULT_CACHE_TTL = float(getenv("RESULT_CACHE_TTL", "600"))
+RESULT_CACHE_MAX_BYTES = int(getenv("RESULT_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from sqlalchemy import select, update, insert, bindparam
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import config
+from db_config import Users
+from lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class ContextStore:
+    def __init__(self, session_maker: async_sessionmaker,
+                 flush_interval: float = config.CONTEXT_FLUSH_INTERVAL,
+                 max_dirty: int = config.CONTEXT_MAX_DIRTY,
+                 cache_size: int = config.CONTEXT_CACHE_SIZE):
+        self.session_maker = session_maker
+        self.flush_interval = flush_interval
+        self.max_dirty = max_dirty
+        self._cache = LRUCache(maxsize=cache_size)
+        self._dirty: Dict[int, dict] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self.reads = 0
+        self.writes = 0
+        self.flushes = 0
+
+    async def get(self, user_id: int) -> dict:
+        if user_id in self._dirty:
+            return self._dirty[user_id]
+        if user_id in self._cache:
+            return self._cache.get(user_id)
+        async with self.session_maker() as session:
+            result = await session.execute(select(Users.context).where(Users.id == user_id))
+            context = result.scalar_one_or_none() or {}
+        self.reads += 1
+        self._cache.set(user_id, context)
+        return context
+
+    async def set(self, user_id: int, context: dict):
+        self._cache.set(user_id, context)
+        self._dirty[user_id] = context
+        self._ensure_flusher()
+        if len(self._dirty) >= self.max_dirty:
+            self._wakeup.set()
+
+    def _ensure_flusher(self):
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("context flush failed, %s users will be retried", len(self._dirty))
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            batch, self._dirty = self._dirty, {}
+            try:
+                await self._write(batch)
+            except BaseException:
+                for user_id, context in batch.items():
+                    self._dirty.setdefault(user_id, context)
+                raise
+            self.writes += len(batch)
+            self.flushes += 1
+
+    async def _write(self, batch: Dict[int, dict]):
+        async with self.session_maker() as session:
+            result = await session.execute(select(Users.id).where(Users.id.in_(batch)))
+            existing = set(result.scalars())
+            if existing:
+                await session.execute(
+                    update(Users.__table__)
+                    .where(Users.__table__.c.id == bindparam("user_id"))
+                    .values(context=bindparam("context")),
+                    [{"user_id": user_id, "context": batch[user_id]} for user_id in existing]
+                )
+            missing = [{"id": user_id, "context": context} for user_id, context in batch.items()
+                       if user_id not in existing]
+            if missing:
+                await session.execute(insert(Users.__table__), missing)
+            await session.commit()
+
+    async def close(self):
+        self._closing = True
+        self._wakeup.set()
+        if self._flusher is not None:
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
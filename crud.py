@@ -1,17 +1,30 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy import (select, insert, update, delete, func, exists, false, case, cast, tuple_, bindparam, String,
+                        Numeric, Float, text, Row)
+from sqlalchemy.orm import aliased
 
 from db_config import Users, Tables, Columns, Data
-from typing import Optional, Dict, List
+from cell_types import typed_values, to_number, to_time, column_kind
+from result_cache import data_versions
+from typing import Optional, Dict, List, AsyncIterator
 
 
 class CRUD:
-    def __init__(self, session: AsyncSession):
+    shadow_columns = ("num_value", "time_value")
+
+    def __init__(self, session: AsyncSession, autocommit: bool = True):
         self.session = session
+        self.autocommit = autocommit
+
+    async def _commit(self):
+        if self.autocommit:
+            await self.session.commit()
+        else:
+            await self.session.flush()
 
-    async def _exists(self, model, record_id: int) -> bool:
-        result = await self.session.execute(select(model).where(model.id == record_id))
-        return result.scalar_one_or_none() is not None
+    @staticmethod
+    def _public_columns(model):
+        return [column for column in model.__table__.columns if column.name not in CRUD.shadow_columns]
 
     async def _user_owned(self, model, user_id: int, record_id: int) -> bool:
         if model == Columns:
@@ -31,6 +44,24 @@ class CRUD:
 
         return False
 
+    @staticmethod
+    def _owned(model, user_id: int):
+        if model == Tables:
+            return Tables.userid == user_id
+        elif model == Columns:
+            return exists().where(Tables.id == Columns.table_id, Tables.userid == user_id)
+        return exists().where(Columns.id == Data.column_id, Tables.id == Columns.table_id, Tables.userid == user_id)
+
+    async def _typed_values(self, column_id: int, value, user_id: int = None) -> Optional[dict]:
+        stmt = select(Columns.type).where(Columns.id == column_id)
+        if user_id is not None:
+            stmt = stmt.where(self._owned(Columns, user_id))
+        result = await self.session.execute(stmt)
+        column = result.one_or_none()
+        if column is None:
+            return None
+        return typed_values(column.type, value)
+
     async def _is_unique(self, model, field_name: str, value, **kwargs) -> bool:
         if not hasattr(model, field_name):
             raise AttributeError(f"Модель {model.__name__} не имеет поля '{field_name}'")
@@ -58,6 +89,10 @@ class CRUD:
                     if not await self._is_unique(Users, 'username', value):
                         return f"Пользователь с именем '{value}' уже существует."
         if model == Data:
+            values = await self._typed_values(data.get('column_id'), data.get('data'), user_id)
+            if values is None:
+                return "Колонка не найдена."
+            data.update(values)
             stmt = insert(model).values(**data)
             await self.session.execute(stmt)
             result = f'row_id: {data["row_id"]}, column_id: {data["column_id"]}'
@@ -65,84 +100,357 @@ class CRUD:
             stmt = insert(model).values(**data).returning(model.id)
             result = await self.session.execute(stmt)
             result = result.scalar()
-        await self.session.commit()
+        data_versions.bump(user_id)
+        await self._commit()
         return result
 
+    async def bulk_insert_rows(self, table_id: int, rows: List[Dict], user_id: int):
+        if not await self._user_owned(Tables, user_id, table_id):
+            return "Таблица не найдена."
+
+        result = await self.session.execute(
+            select(Columns.column_name, Columns.id, Columns.type).where(Columns.table_id == table_id)
+        )
+        columns = {row.column_name: row for row in result.all()}
+        unknown = {name for row in rows for name in row if name not in columns}
+        if unknown:
+            return f"В таблице нет колонок: {', '.join(sorted(unknown))}."
+
+        rows = [row for row in rows if row]
+        if not rows:
+            return []
+        # One MAX per column keeps each lookup on the (column_id, row_id) index instead of scanning all of data.
+        result = await self.session.execute(select(*[
+            select(func.max(Data.row_id)).where(Data.column_id == column.id).scalar_subquery()
+            for column in columns.values()
+        ]))
+        first_row_id = max((row_id or 0 for row_id in result.one()), default=0) + 1
+        row_ids = list(range(first_row_id, first_row_id + len(rows)))
+
+        values = [
+            {
+                "row_id": row_id,
+                "column_id": columns[name].id,
+                "data": None if value is None else str(value),
+                **typed_values(columns[name].type, value),
+            }
+            for row_id, row in zip(row_ids, rows)
+            for name, value in row.items()
+        ]
+        if values:
+            await self.session.execute(insert(Data), values)
+            data_versions.bump(user_id)
+        await self._commit()
+        return row_ids
+
+    async def schema(self, user_id: int) -> List[Dict]:
+        stmt = (
+            select(Tables.id, Tables.table_name, Columns.id.label("column_id"), Columns.column_name, Columns.type)
+            .outerjoin(Columns, Columns.table_id == Tables.id)
+            .where(Tables.userid == user_id)
+            .order_by(Tables.id, Columns.id)
+        )
+        result = await self.session.execute(stmt)
+        tables = {}
+        for row in result.all():
+            table = tables.setdefault(row.id, {"id": row.id, "table_name": row.table_name, "columns": []})
+            if row.column_id is not None:
+                table["columns"].append({"id": row.column_id, "column_name": row.column_name, "type": row.type})
+        return list(tables.values())
+
+    async def read_table(self, table_id: int, user_id: int, column_names: List[str] = None,
+                         limit: int = 50, offset: int = 0):
+        if not await self._user_owned(Tables, user_id, table_id):
+            return "Таблица не найдена."
+
+        result = await self.session.execute(
+            select(Columns.id, Columns.column_name).where(Columns.table_id == table_id).order_by(Columns.id)
+        )
+        columns = result.all()
+        if column_names:
+            known = {column.column_name for column in columns}
+            unknown = [name for name in column_names if name not in known]
+            if unknown:
+                return f"В таблице нет колонок: {', '.join(unknown)}."
+            columns = [column for column in columns if column.column_name in column_names]
+        if not columns:
+            return []
+
+        stmt = (
+            select(
+                Data.row_id,
+                *[func.max(case((Data.column_id == column.id, Data.data))).label(column.column_name)
+                  for column in columns]
+            )
+            .where(Data.column_id.in_([column.id for column in columns]))
+            .group_by(Data.row_id)
+            .order_by(Data.row_id)
+            .limit(limit)
+            .offset(offset)
+        )
+        result = await self.session.execute(stmt)
+        return [dict(row) for row in result.mappings()]
+
     async def get(self, model, record_id: int, user_id: int = None, column_id: int = None):
         stmt = None
         if model == Tables:
             stmt = select(model).where(model.id == record_id, model.userid == user_id)
         elif model == Columns:
-            if await self._user_owned(Columns, user_id, record_id):
-                stmt = select(model).where(model.id == record_id)
+            stmt = select(model).where(model.id == record_id, self._owned(Columns, user_id))
         elif model == Data:
             if record_id and column_id:
-                if await self._user_owned(Columns, user_id, column_id):
-                    stmt = select(Data).where(
-                        Data.row_id == record_id,
-                        Data.column_id == column_id
-                    )
-        if stmt:
+                stmt = select(Data).where(
+                    Data.row_id == record_id,
+                    Data.column_id == column_id,
+                    self._owned(Data, user_id)
+                )
+        if stmt is not None:
             result = await self.session.execute(stmt)
             record = result.scalars().first()
             if record:
-                return {col.name: getattr(record, col.name) for col in record.__table__.columns}
+                return {col.name: getattr(record, col.name) for col in self._public_columns(model)}
         return None
 
     async def update(self, model, record_id: int, data: dict, user_id: int = None, column_id: int = None) -> bool:
-        if not await self._exists(model, record_id):
+        if not data:
             return False
-
-        if user_id is not None:
-            if model == Columns:
-                if not await self._user_owned(Columns, user_id, record_id):
-                    return False
-            elif model == Tables:
-                if not await self._user_owned(Tables, user_id, record_id):
-                    return False
-            elif model == Data:
-                if not await self._user_owned(Columns, user_id, column_id):
-                    return False
         if model != Data:
-            stmt = update(model).where(model.id == record_id).values(**data)
+            stmt = update(model).where(model.id == record_id)
         else:
-            stmt = update(model).where(model.row_id == record_id, model.column_id == column_id).values(**data)
-        await self.session.execute(stmt)
-        await self.session.commit()
-        return True
+            if 'data' in data:
+                data.update(await self._typed_values(column_id, data['data']) or {})
+            stmt = update(model).where(model.row_id == record_id, model.column_id == column_id)
+        if user_id is not None:
+            stmt = stmt.where(self._owned(model, user_id))
 
-    async def delete(self, model, record_id: int, user_id: int = None, column_id: int = None) -> bool:
-        if not await self._exists(model, record_id):
+        result = await self.session.execute(stmt.values(**data))
+        if result.rowcount == 0:
             return False
+        data_versions.bump(user_id)
+        await self._commit()
+        if model == Columns and 'type' in data:
+            await self._retype_column(record_id, data['type'])
+        return True
 
-        if model == Tables:
-            if not await self._user_owned(Tables, user_id, record_id):
-                return False
-            stmt = delete(model).where(model.id == record_id)
+    @staticmethod
+    def _sql_number(value):
+        """to_number() in SQL: whitespace dropped, ',' as decimal point, non-numeric or infinite text -> NULL."""
+        cleaned = value
+        for char in (" ", "\u00a0", "\t", "\n", "\r"):
+            cleaned = func.replace(cleaned, char, "")
+        cleaned = func.replace(cleaned, ",", ".")
+        number = cast(cleaned, Float)
+        # NUMERIC affinity converts the text side only when it is a well-formed number.
+        return case(
+            ((cleaned != "") & (cast(cleaned, Numeric) == cleaned) & (func.abs(number) <= 1.7976931348623157e308),
+             number),
+            else_=None
+        )
 
-        elif model == Data:
-            if not await self._user_owned(Columns, user_id, column_id):
-                return False
+    async def _retype_column(self, column_id: int, column_type: str, batch_size: int = 10000):
+        # Keyset batches over (column_id, row_id), committed one by one, so other writers get the lock in between.
+        kind = column_kind(column_type)
+        data = Data.__table__
+        last = None
+        while True:
+            in_batch = Data.column_id == column_id
+            if last is not None:
+                in_batch = in_batch & (Data.row_id > last)
+            result = await self.session.execute(
+                select(Data.row_id).where(in_batch).order_by(Data.row_id).offset(batch_size - 1).limit(1)
+            )
+            upper = result.scalar_one_or_none()
+            if upper is not None:
+                in_batch = in_batch & (Data.row_id <= upper)
+
+            if kind == "time":
+                rows = (await self.session.execute(select(Data.row_id, Data.data).where(in_batch))).all()
+                if rows:
+                    await self.session.execute(
+                        update(data)
+                        .where(data.c.row_id == bindparam("b_row_id"), data.c.column_id == column_id)
+                        .values(num_value=None, time_value=bindparam("time_value")),
+                        [{"b_row_id": row.row_id, "time_value": to_time(row.data)} for row in rows]
+                    )
+            else:
+                await self.session.execute(
+                    update(data).where(in_batch)
+                    .values(num_value=self._sql_number(data.c.data) if kind == "number" else None, time_value=None)
+                )
+            await self._commit()
+            if upper is None:
+                break
+            last = upper
+
+    async def delete(self, model, record_id: int, user_id: int = None, column_id: int = None) -> bool:
+        if model == Data:
             stmt = delete(model).where(
                 Data.row_id == record_id,
                 Data.column_id == column_id
             )
-
         else:
-            if not await self._user_owned(Columns, user_id, record_id):
-                return False
             stmt = delete(model).where(model.id == record_id)
 
-        await self.session.execute(stmt)
-        await self.session.commit()
+        result = await self.session.execute(stmt.where(self._owned(model, user_id)))
+        if result.rowcount == 0:
+            return False
+        data_versions.bump(user_id)
+        await self._commit()
         return True
 
     async def list_all(self, model, user_id: int = None) -> List[Dict]:
+        return [dict(row._mapping) async for row in self.iter_all(model, user_id)]
+
+    async def iter_all(self, model, user_id: int = None, filters: dict = None,
+                       batch_size: int = 1000) -> AsyncIterator[Row]:
+        key = list(model.__table__.primary_key.columns)
+        base = select(*self._public_columns(model)).order_by(*key).limit(batch_size)
         if user_id is not None and hasattr(model, 'userid'):
-            stmt = select(model).where(model.userid == user_id)
+            base = base.where(model.userid == user_id)
+        for field_name, filter_value in (filters or {}).items():
+            base = base.where(self._compile_filter(model, field_name, filter_value))
+
+        last = None
+        while True:
+            stmt = base
+            if last is not None:
+                stmt = stmt.where(tuple_(*key) > tuple_(*last))
+            result = await self.session.execute(stmt)
+            rows = result.all()
+            for row in rows:
+                yield row
+            if len(rows) < batch_size:
+                break
+            last = [getattr(rows[-1], column.name) for column in key]
+
+    @staticmethod
+    def _compile_filter(model, field_name: str, filter_value):
+        column = model.__table__.columns.get(field_name)
+        if column is None:
+            return false()
+        if isinstance(filter_value, dict):
+            if "like" in filter_value:
+                if not isinstance(column.type, String):
+                    return false()
+                return func.instr(column, filter_value["like"]) > 0
+            elif "eq" in filter_value:
+                return column == filter_value["eq"]
+            elif "gt" in filter_value:
+                column, value = CRUD._typed_comparison(model, column, filter_value["gt"])
+                return column > value
+            elif "lt" in filter_value:
+                column, value = CRUD._typed_comparison(model, column, filter_value["lt"])
+                return column < value
+            return false()
+        return column == filter_value
+
+    @staticmethod
+    def _typed_comparison(model, column, value):
+        if model == Data and column.name == "data":
+            number = to_number(value)
+            if number is not None:
+                return Data.num_value, number
+            moment = to_time(value)
+            if moment is not None:
+                return Data.time_value, moment
+        return column, value
+
+    @staticmethod
+    def _order_by(model, order_by: str = None):
+        if not order_by:
+            return list(model.__table__.primary_key.columns)
+        descending = order_by.startswith("-")
+        column = model.__table__.columns.get(order_by.lstrip("-"))
+        if column is None:
+            return list(model.__table__.primary_key.columns)
+        columns = [Data.num_value, Data.time_value, column] if model == Data and column.name == "data" else [column]
+        return [c.desc() if descending else c for c in columns] + list(model.__table__.primary_key.columns)
+
+    async def list_filtered(self, model, filters: dict, user_id: int = None,
+                            limit: int = None, offset: int = 0, order_by: str = None) -> List[Dict]:
+        stmt = select(*self._public_columns(model))
+        if user_id is not None and hasattr(model, 'userid'):
+            stmt = stmt.where(model.userid == user_id)
+        for field_name, filter_value in filters.items():
+            stmt = stmt.where(self._compile_filter(model, field_name, filter_value))
+        stmt = stmt.order_by(*self._order_by(model, order_by))
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        if offset:
+            stmt = stmt.offset(offset)
+
+        result = await self.session.execute(stmt)
+        return [dict(row) for row in result.mappings()]
+
+    @staticmethod
+    def _fts_query(query: str) -> str:
+        terms = [term.replace('"', '""') for term in query.split()]
+        return " ".join(f'"{term}"*' for term in terms if term)
+
+    async def search(self, query: str, user_id: int, table_id: int = None, limit: int = 20) -> List[Dict]:
+        fts_query = self._fts_query(query)
+        if not fts_query:
+            return []
+        stmt = text(
+            "SELECT tables.id AS table_id, tables.table_name, columns.id AS column_id, columns.column_name, "
+            "data.row_id, snippet(data_fts, 0, '[', ']', '…', 12) AS snippet "
+            "FROM data_fts "
+            "JOIN data ON data.rowid = data_fts.rowid "
+            "JOIN columns ON columns.id = data.column_id "
+            "JOIN tables ON tables.id = columns.table_id "
+            "WHERE data_fts MATCH :query AND tables.userid = :user_id "
+            "AND (:table_id IS NULL OR tables.id = :table_id) "
+            "ORDER BY data_fts.rank LIMIT :limit"
+        )
+        result = await self.session.execute(
+            stmt, {"query": fts_query, "user_id": user_id, "table_id": table_id, "limit": limit}
+        )
+        return [dict(row) for row in result.mappings()]
+
+    async def aggregate(self, column_id: int, function: str, user_id: int,
+                        group_by_column_id: int = None, limit: int = 50):
+        functions = {"count": func.count, "sum": func.sum, "avg": func.avg, "min": func.min, "max": func.max}
+        if function not in functions:
+            return f"Неизвестная функция '{function}'. Доступны: {', '.join(functions)}."
+
+        result = await self.session.execute(
+            select(Columns.id, Columns.table_id, Columns.column_name, Columns.type)
+            .where(Columns.id.in_([column_id, group_by_column_id]))
+        )
+        columns = {row.id: row for row in result.all()}
+        target = columns.get(column_id)
+        if target is None or not await self._user_owned(Tables, user_id, target.table_id):
+            return "Колонка не найдена."
+        if group_by_column_id is not None:
+            group = columns.get(group_by_column_id)
+            if group is None or group.table_id != target.table_id:
+                return "Колонка для группировки не найдена в этой таблице."
+
+        kind = column_kind(target.type)
+        if function in ("sum", "avg") and kind != "number":
+            return (f"Колонка '{target.column_name}' не числовая (тип {target.type}). "
+                    f"Измени тип колонки на INTEGER или REAL через columns_update.")
+        if function == "count":
+            value = Data.data
+        elif kind == "number":
+            value = Data.num_value
+        elif kind == "time":
+            value = Data.time_value
         else:
-            stmt = select(model)
+            value = Data.data
 
+        aggregated = functions[function](value).label("value")
+        if group_by_column_id is None:
+            stmt = select(aggregated).where(Data.column_id == column_id)
+        else:
+            group_data = aliased(Data)
+            stmt = (
+                select(group_data.data.label("group"), aggregated)
+                .join(group_data, (group_data.row_id == Data.row_id) & (group_data.column_id == group_by_column_id))
+                .where(Data.column_id == column_id)
+                .group_by(group_data.data)
+                .order_by(aggregated.desc())
+                .limit(limit)
+            )
         result = await self.session.execute(stmt)
-        records = result.scalars().all()
-        return [{col.name: getattr(r, col.name) for col in r.__table__.columns} for r in records]
\ No newline at end of file
+        return [dict(row) for row in result.mappings()]
@@ -1,10 +1,35 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, JSON, PrimaryKeyConstraint, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, JSON, PrimaryKeyConstraint, \
+    UniqueConstraint, Index, text, event, select, update, bindparam
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import relationship, declarative_base
 
+import config
+from cell_types import column_kind, typed_values
+
 Base = declarative_base()
 
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size=-{config.SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def make_engine(url: str = config.DATABASE_URL, echo: bool = config.DATABASE_ECHO):
+    kwargs = {}
+    if url.startswith("sqlite") and ":memory:" not in url:
+        kwargs = {"pool_size": config.DATABASE_POOL_SIZE, "max_overflow": config.DATABASE_MAX_OVERFLOW}
+    new_engine = create_async_engine(url, echo=echo, **kwargs)
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return new_engine
+
+
 class Users(Base):
     __tablename__ = "users"
 
@@ -47,29 +72,138 @@ class Data(Base):
     row_id = Column(Integer)
     column_id = Column(Integer, ForeignKey("columns.id"))
     data = Column(String)
+    num_value = Column(Float)
+    time_value = Column(DateTime)
 
-    __table_args__ = (PrimaryKeyConstraint("row_id", "column_id"),)
+    __table_args__ = (
+        PrimaryKeyConstraint("row_id", "column_id"),
+        Index("ix_data_column_row_data", "column_id", "row_id", "data"),
+        Index("ix_data_column_num", "column_id", "num_value"),
+        Index("ix_data_column_time", "column_id", "time_value"),
+    )
 
     column = relationship("Columns", back_populates="data")
 
 
+SEARCH_INDEX_DDL = [
+    "CREATE VIRTUAL TABLE data_fts USING fts5("
+    "data, content='data', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS data_fts_insert AFTER INSERT ON data BEGIN "
+    "INSERT INTO data_fts(rowid, data) VALUES (new.rowid, new.data); END",
+    "CREATE TRIGGER IF NOT EXISTS data_fts_delete AFTER DELETE ON data BEGIN "
+    "INSERT INTO data_fts(data_fts, rowid, data) VALUES ('delete', old.rowid, old.data); END",
+    "CREATE TRIGGER IF NOT EXISTS data_fts_update AFTER UPDATE OF data ON data BEGIN "
+    "INSERT INTO data_fts(data_fts, rowid, data) VALUES ('delete', old.rowid, old.data); "
+    "INSERT INTO data_fts(rowid, data) VALUES (new.rowid, new.data); END",
+]
+
+
+async def refresh_typed_values(conn, column_id: int = None, batch_size: int = 10000):
+    stmt = select(Data.row_id, Data.column_id, Data.data, Columns.type).join(Columns, Columns.id == Data.column_id)
+    if column_id is not None:
+        stmt = stmt.where(Data.column_id == column_id)
+    result = await conn.execute(stmt)
+    rows = [row for row in result.all() if column_id is not None or column_kind(row.type)]
+
+    stmt = (
+        update(Data.__table__)
+        .where(Data.row_id == bindparam("b_row_id"), Data.column_id == bindparam("b_column_id"))
+        .values(num_value=bindparam("num_value"), time_value=bindparam("time_value"))
+    )
+    for start in range(0, len(rows), batch_size):
+        await conn.execute(stmt, [
+            {"b_row_id": row.row_id, "b_column_id": row.column_id, **typed_values(row.type, row.data)}
+            for row in rows[start:start + batch_size]
+        ])
+
+
 class Migration:
+    @staticmethod
+    def steps():
+        return [
+            Migration._create_search_index,
+            Migration._create_cell_index,
+            Migration._add_typed_values,
+        ]
+
     @staticmethod
     async def up(engine):
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            result = await conn.execute(text("PRAGMA user_version"))
+            version = result.scalar()
+            for number, step in enumerate(Migration.steps(), start=1):
+                if number > version:
+                    await step(conn)
+                    await conn.execute(text(f"PRAGMA user_version = {number}"))
 
     @staticmethod
     async def down(engine):
         async with engine.begin() as conn:
+            await conn.execute(text("DROP TABLE IF EXISTS data_fts"))
             await conn.run_sync(Base.metadata.drop_all)
+            await conn.execute(text("PRAGMA user_version = 0"))
+
+    @staticmethod
+    async def _create_indexes(conn, table, *names):
+        def create(sync_conn):
+            for index in table.indexes:
+                if index.name in names:
+                    index.create(sync_conn, checkfirst=True)
+
+        await conn.run_sync(create)
+        await conn.execute(text("ANALYZE"))
+
+    @staticmethod
+    async def _create_cell_index(conn):
+        await Migration._create_indexes(conn, Data.__table__, "ix_data_column_row_data")
+
+    @staticmethod
+    async def _add_typed_values(conn):
+        result = await conn.execute(text("PRAGMA table_info(data)"))
+        existing = {row[1] for row in result}
+        if "num_value" not in existing:
+            await conn.execute(text("ALTER TABLE data ADD COLUMN num_value FLOAT"))
+        if "time_value" not in existing:
+            await conn.execute(text("ALTER TABLE data ADD COLUMN time_value DATETIME"))
+        await conn.execute(text("DROP TRIGGER IF EXISTS data_fts_update"))
+        await conn.execute(text(SEARCH_INDEX_DDL[3]))
+        await refresh_typed_values(conn)
+        await Migration._create_indexes(conn, Data.__table__, "ix_data_column_num", "ix_data_column_time")
+
+    @staticmethod
+    async def _create_search_index(conn):
+        result = await conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'data_fts'"))
+        if result.scalar() is None:
+            await conn.execute(text(SEARCH_INDEX_DDL[0]))
+            await conn.execute(text("INSERT INTO data_fts(data_fts) VALUES ('rebuild')"))
+        for statement in SEARCH_INDEX_DDL[1:]:
+            await conn.execute(text(statement))
+
+    @staticmethod
+    async def rebuild_search_index(engine):
+        async with engine.begin() as conn:
+            await Migration._create_search_index(conn)
+            await conn.execute(text("INSERT INTO data_fts(data_fts) VALUES ('rebuild')"))
+            await conn.execute(text("INSERT INTO data_fts(data_fts) VALUES ('optimize')"))
+
+
+engine = make_engine()
+async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
 
 async def drop_tables():
-    engine = create_async_engine("sqlite+aiosqlite:///./test.db", echo=True)
     await Migration.down(engine)
 
 
+async def rebuild_search_index():
+    await Migration.rebuild_search_index(engine)
+
+
 if __name__ == '__main__':
     import asyncio
-    asyncio.run(drop_tables())
\ No newline at end of file
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == 'rebuild-search':
+        asyncio.run(rebuild_search_index())
+    else:
+        asyncio.run(drop_tables())
\ No newline at end of file
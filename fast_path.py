@@ -0,0 +1,87 @@
+import logging
+import re
+import time
+from typing import Optional
+
+from crud import CRUD
+from db_config import async_session_maker
+from formatter import format_rows
+from result_cache import normalize
+from schema_cache import SchemaCache
+
+logger = logging.getLogger(__name__)
+
+TABLES_PATTERNS = [
+    re.compile(r"^(?:(?:покажи|выведи|перечисли|список)\s+)?(?:(?:мои|все|моих|всех)\s+)?таблиц[ыа]?$"),
+    re.compile(r"^какие\s+(?:у\s+меня\s+)?(?:есть\s+)?таблицы(?:\s+у\s+меня)?(?:\s+есть)?$"),
+    re.compile(r"^(?:show|list)\s+(?:me\s+)?(?:my\s+|all\s+)?tables$"),
+]
+SHOW_PATTERNS = [
+    re.compile(r"^(?:покажи|выведи|открой)\s+(?:мне\s+)?(?:таблицу|содержимое\s+таблицы)\s+(?P<name>.+)$"),
+    re.compile(r"^show\s+(?:me\s+)?(?:the\s+)?table\s+(?P<name>.+)$"),
+]
+
+
+class FastPath:
+    def __init__(self, schema_cache: SchemaCache, max_rows: int = 20):
+        self.schema_cache = schema_cache
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self.seconds = 0.0
+
+    async def answer(self, query: str, user_id: int) -> Optional[str]:
+        started = time.perf_counter()
+        text = normalize(query)
+        result = None
+        if any(pattern.match(text) for pattern in TABLES_PATTERNS):
+            intent, result = "tables", await self.tables(user_id)
+        else:
+            for pattern in SHOW_PATTERNS:
+                match = pattern.match(text)
+                if match:
+                    intent, result = "show", await self.show(match.group("name"), user_id, required=False)
+                    break
+        if result is None:
+            self.misses += 1
+            return None
+        elapsed = time.perf_counter() - started
+        self.hits += 1
+        self.seconds += elapsed
+        logger.info("fast path %s: %.1f ms, hit rate %.0f%% (%d/%d)",
+                    intent, elapsed * 1000, self.hit_rate * 100, self.hits, self.hits + self.misses)
+        return result
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    async def tables(self, user_id: int) -> str:
+        catalog = await self.schema_cache.get(user_id)
+        if not catalog:
+            return "У вас пока нет таблиц."
+        lines = ["Ваши таблицы:"]
+        for table in catalog:
+            columns = ", ".join(column["column_name"] for column in table["columns"])
+            lines.append(f"• {table['table_name']} (id {table['id']}): {columns or 'нет колонок'}")
+        return "\n".join(lines)
+
+    async def show(self, name: str, user_id: int, required: bool = True) -> Optional[str]:
+        name = normalize(name).strip("«»\"'")
+        catalog = await self.schema_cache.get(user_id)
+        table = next((t for t in catalog if normalize(t["table_name"]) == name), None)
+        if table is None:
+            return "Таблица не найдена." if required else None
+        async with async_session_maker() as session:
+            rows = await CRUD(session).read_table(table["id"], user_id, limit=self.max_rows + 1)
+        if isinstance(rows, str):
+            return rows
+        header = [column["column_name"] for column in table["columns"]]
+        if not rows:
+            return f"Таблица {table['table_name']} пуста."
+        lines = [f"Таблица {table['table_name']}:"]
+        lines += format_rows(header, [[row.get(column) for column in header] for row in rows[:self.max_rows]])
+        if len(rows) > self.max_rows:
+            lines.append(f"… показаны первые {self.max_rows} строк.")
+        return "\n".join(lines)
@@ -0,0 +1,121 @@
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+import config
+from memory import estimate_tokens
+
+FOOTER_TOKENS = 40
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    return str(value).replace("\n", " ").replace("|", "/")
+
+
+def format_rows(header: List[str], rows: List[List[Any]]) -> List[str]:
+    return [" | ".join(header)] + [" | ".join(_cell(value) for value in row) for row in rows]
+
+
+def records_to_rows(records: List[Dict]):
+    header = []
+    for record in records:
+        for key in record:
+            if key not in header:
+                header.append(key)
+    return header, [[record.get(key) for key in header] for record in records]
+
+
+class PagedText(str):
+    """Text already cut to the token cap, with its own footer; ResultPager.text() passes it through."""
+
+
+class ResultPager:
+    def __init__(self, max_tokens: int = config.TOOL_RESULT_TOKENS, max_cursors: int = 1000, ttl: int = 3600):
+        self.max_tokens = max_tokens
+        self.max_cursors = max_cursors
+        self.ttl = ttl
+        self._cursors: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def _store(self, user_id: int, header: str, lines: List[str], shown: int, total: Any, unit: str,
+               note: str) -> str:
+        cursor = uuid.uuid4().hex[:8]
+        self._cursors[cursor] = {
+            "user_id": user_id, "header": header, "lines": lines, "shown": shown, "total": total, "unit": unit,
+            "note": note, "created": time.monotonic()
+        }
+        while len(self._cursors) > self.max_cursors:
+            self._cursors.popitem(last=False)
+        return cursor
+
+    def _fit(self, lines: List[str], budget: int) -> List[str]:
+        page = []
+        for line in lines:
+            cost = estimate_tokens(line)
+            if page and cost > budget:
+                break
+            page.append(line[:self.max_tokens * 3])
+            budget -= cost
+        return page
+
+    def _page(self, user_id: int, header: str, lines: List[str], shown: int, total: Any,
+              unit: str = "строк", note: str = "") -> PagedText:
+        budget = self.max_tokens - FOOTER_TOKENS - estimate_tokens(header) - (estimate_tokens(note) if note else 0)
+        page = self._fit(lines, budget)
+        rest = lines[len(page):]
+        shown += len(page)
+        text = "\n".join(([header] if header else []) + page)
+        if rest:
+            cursor = self._store(user_id, header, rest, shown, total, unit, note)
+            text += (f"\n… показано {shown} из {total} {unit}. "
+                     f"Для продолжения вызови next_page с cursor='{cursor}'.")
+        if note:
+            text += "\n" + note
+        return PagedText(text)
+
+    def records(self, records: List[Dict], user_id: int, limit: int = None, offset: int = None) -> str:
+        """Callers that cap a query fetch limit + 1 rows; the extra row only tells the model that more exist."""
+        if not records:
+            return "Не найдено"
+        more = limit is not None and len(records) > limit
+        if more:
+            records = records[:limit]
+        header, rows = records_to_rows(records)
+        lines = format_rows(header, rows)
+        note = ""
+        if more and offset is not None:
+            note = f"В базе есть ещё записи. Для продолжения повтори запрос с offset={offset + limit}."
+        elif more:
+            note = f"Выведены только первые {limit}, в базе есть ещё."
+        return self._page(user_id, lines[0], lines[1:], 0, f"{len(rows)}+" if more else len(rows), note=note)
+
+    def preview(self, records: List[Dict]) -> str:
+        """records() without a cursor, for text nothing can page through, such as the plan report."""
+        if not records:
+            return "Не найдено"
+        header, rows = records_to_rows(records)
+        lines = format_rows(header, rows)
+        page = self._fit(lines[1:], self.max_tokens - FOOTER_TOKENS - estimate_tokens(lines[0]))
+        text = "\n".join(lines[:1] + page)
+        if len(page) < len(rows):
+            text += f"\n… показано {len(page)} из {len(rows)} строк."
+        return text
+
+    def text(self, text: str, user_id: int) -> str:
+        if isinstance(text, PagedText) or estimate_tokens(text) <= self.max_tokens:
+            return text
+        chunk = (self.max_tokens - FOOTER_TOKENS) * 3
+        lines = [text[start:start + chunk] for start in range(0, len(text), chunk)]
+        return self._page(user_id, "", lines, 0, len(lines), unit="частей")
+
+    def next_page(self, cursor: str, user_id: int) -> str:
+        state = self._cursors.pop(cursor, None)
+        if state is None or state["user_id"] != user_id or time.monotonic() - state["created"] > self.ttl:
+            return "Курсор не найден или устарел. Повтори исходный запрос."
+        return self._page(user_id, state["header"], state["lines"], state["shown"], state["total"], state["unit"],
+                          state["note"])
+
+
+pager = ResultPager()
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import time
+from typing import Dict
+
+import ollama
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBusyError(Exception):
+    pass
+
+
+class LLMPool:
+    def __init__(self, host: str = config.OLLAMA_HOST, max_concurrency: int = config.OLLAMA_MAX_CONCURRENCY,
+                 max_queue: int = config.OLLAMA_MAX_QUEUE, keep_alive=config.OLLAMA_KEEP_ALIVE):
+        self.client = ollama.AsyncClient(host)
+        self.keep_alive = keep_alive
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.prefill_seconds = 0.0
+        self.model_stats: Dict[str, Dict[str, float]] = {}
+
+    async def _acquire(self):
+        if self.waiting >= self.max_queue:
+            raise LLMBusyError("Модель перегружена запросами, попробуйте позже.")
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+    def _release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    async def chat(self, **kwargs):
+        if self.keep_alive is not None:
+            kwargs.setdefault("keep_alive", self.keep_alive)
+        await self._acquire()
+        started = time.perf_counter()
+        try:
+            response = await self.client.chat(**kwargs)
+        finally:
+            self._release()
+        if not kwargs.get("stream"):
+            self._record(kwargs.get("model"), response, time.perf_counter() - started)
+        return response
+
+    async def stream(self, **kwargs):
+        if self.keep_alive is not None:
+            kwargs.setdefault("keep_alive", self.keep_alive)
+        await self._acquire()
+        started = time.perf_counter()
+        try:
+            async for part in await self.client.chat(stream=True, **kwargs):
+                if part.get("done"):
+                    self._record(kwargs.get("model"), part, time.perf_counter() - started)
+                yield part
+        finally:
+            self._release()
+
+    def _record(self, model: str, response, elapsed: float):
+        prompt_tokens = response.get("prompt_eval_count") or 0
+        prefill = (response.get("prompt_eval_duration") or 0) / 1e9
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.prefill_seconds += prefill
+        stats = self.model_stats.setdefault(model, {"calls": 0, "seconds": 0.0})
+        stats["calls"] += 1
+        stats["seconds"] += elapsed
+        logger.info("llm %s: prompt_tokens=%d prefill=%.0f ms total=%.0f ms (avg %.0f ms over %d calls)",
+                    model, prompt_tokens, prefill * 1000, elapsed * 1000,
+                    self.average_latency(model) * 1000, stats["calls"])
+
+    def average_latency(self, model: str) -> float:
+        stats = self.model_stats.get(model)
+        return stats["seconds"] / stats["calls"] if stats else 0.0
+
+    async def warm_up(self, models):
+        for model in models:
+            started = time.perf_counter()
+            try:
+                await self.client.chat(model=model, messages=[], keep_alive=self.keep_alive)
+            except Exception:
+                logger.exception("warm-up of %s failed", model)
+                continue
+            logger.info("warm-up %s: %.0f ms", model, (time.perf_counter() - started) * 1000)
@@ -1,26 +1,30 @@
 import logging
 import asyncio
+import signal
+from contextlib import suppress
+from itertools import groupby
+from operator import itemgetter
 from ai import AIHandler
-from os import getenv
 from aiogram import Bot, Dispatcher, html, types, F
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
-from aiogram.filters import CommandStart, Command
+from aiogram.filters import CommandStart, Command, CommandObject
 from aiogram.utils.chat_action import ChatActionSender
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
 from aiogram.types import Message, CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, ReactionTypeEmoji
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from db_config import Users, Tables, Columns, Data, Migration
-from dotenv import load_dotenv
-
-load_dotenv()
-TOKEN = getenv("BOT_TOKEN")
-
-engine = create_async_engine("sqlite+aiosqlite:///./test.db", echo=False)
-async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+from db_config import Users, Tables, Columns, Data, Migration, engine, async_session_maker
+from config import BOT_TOKEN as TOKEN
+import config
+from lru import LRUCache
+from streaming import ReplyStreamer
+from user_queue import UserQueue
 
 dp = Dispatcher()
 
 ai_handler = AIHandler()
+known_users = LRUCache(maxsize=10000)
+background = set()
 
 async def create_tables():
     await Migration.up(engine)
@@ -28,12 +32,16 @@ async def create_tables():
 
 async def user_exists(message: Message):
     user_id = message.from_user.id
+    if user_id in known_users:
+        return known_users.get(user_id)
 
     async with async_session_maker() as session:
         result = await session.execute(
             Users.__table__.select().where(Users.id == user_id)
         )
         existing_user = result.scalar_one_or_none()
+        if existing_user:
+            known_users.set(user_id, existing_user)
         return existing_user
 
 
@@ -45,6 +53,7 @@ async def start_message(message: Message):
             new_user = Users(id=message.from_user.id, username=username)
             session.add(new_user)
             await session.commit()
+            known_users.set(new_user.id, new_user.id)
             await message.answer(f"Привет, {username}! Вы успешно зарегистрированы.")
     else:
         await message.answer(f"Привет, {username}! Вы уже зарегистрированы.")
@@ -59,6 +68,27 @@ async def start_message(message: Message):
     )
 
 
+async def answer(user_id: int, batch: list):
+    for mode, group in groupby(batch, key=itemgetter(0)):
+        group = list(group)
+        message = group[-1][2]
+        query = "\n".join(query for _, query, _ in group)
+        streamer = ReplyStreamer(message)
+        async with ChatActionSender.typing(message.chat.id, message.bot):
+            response = await ai_handler.handle_query(query, user_id, mode=mode, on_text=streamer.update)
+        await streamer.finish(response)
+
+
+user_queue = UserQueue(answer)
+
+
+async def enqueue(message: Message, query: str, mode: str = None):
+    if not user_queue.submit(message.from_user.id, (mode, query, message)):
+        await message.reply("Бот ещё обрабатывает ваши предыдущие сообщения. Дождитесь ответа и повторите.")
+        return False
+    await message.react([ReactionTypeEmoji(emoji='⚡')])
+
+
 @dp.message(Command('clear'))
 async def clear_context(message: Message):
     if not await user_exists(message):
@@ -69,6 +99,36 @@ async def clear_context(message: Message):
     await message.answer("Контекст успешно очищен.")
 
 
+@dp.message(Command('plan'))
+async def plan_message(message: Message, command: CommandObject):
+    if not await user_exists(message):
+        await message.reply("Для начала используйте /start")
+        return False
+    if not command.args:
+        await message.reply("Использование: /plan <задача>")
+        return False
+    await enqueue(message, command.args, mode="plan")
+
+
+@dp.message(Command('tables'))
+async def tables_message(message: Message):
+    if not await user_exists(message):
+        await message.reply("Для начала используйте /start")
+        return False
+    await message.reply(await ai_handler.fast_path.tables(message.from_user.id), parse_mode=None)
+
+
+@dp.message(Command('show'))
+async def show_message(message: Message, command: CommandObject):
+    if not await user_exists(message):
+        await message.reply("Для начала используйте /start")
+        return False
+    if not command.args:
+        await message.reply("Использование: /show <название таблицы>")
+        return False
+    await message.reply(await ai_handler.fast_path.show(command.args, message.from_user.id), parse_mode=None)
+
+
 @dp.callback_query(lambda c: c.data == "info")
 async def info_button(callback: CallbackQuery):
     info = """Данный бот поможет создавать таблицы, управлять ими, производить поиск данных и генерировать их."""
@@ -82,18 +142,58 @@ async def handle_message(message: Message):
         return False
     if message.text.startswith('/'):
         return False
-    await message.react([ReactionTypeEmoji(emoji='⚡')])
-    async with ChatActionSender.typing(message.chat.id, message.bot):
-        response = await ai_handler.handle_query(message.text, message.from_user.id)
-        if response.startswith('<think>'):
-            response = response.split('</think>')[-1]
-        await message.reply(response)
+    await enqueue(message, message.text)
+
+
+@dp.startup()
+async def on_startup(bot: Bot):
+    task = asyncio.create_task(ai_handler.warm_up())
+    background.add(task)
+    task.add_done_callback(background.discard)
+    if config.BOT_MODE == "webhook" and config.WEBHOOK_URL:
+        await bot.set_webhook(
+            config.WEBHOOK_URL.rstrip("/") + config.WEBHOOK_PATH,
+            secret_token=config.WEBHOOK_SECRET,
+            allowed_updates=dp.resolve_used_update_types()
+        )
+
+
+@dp.shutdown()
+async def on_shutdown():
+    await user_queue.drain()
+    await ai_handler.memory.drain()
+    await ai_handler.contexts.close()
+
+
+def build_webhook_app(bot: Bot, dispatcher: Dispatcher = dp) -> web.Application:
+    app = web.Application()
+    setup_application(app, dispatcher, bot=bot)
+    SimpleRequestHandler(dispatcher, bot, secret_token=config.WEBHOOK_SECRET).register(app, path=config.WEBHOOK_PATH)
+    return app
+
+
+async def run_webhook(bot: Bot):
+    runner = web.AppRunner(build_webhook_app(bot))
+    await runner.setup()
+    await web.TCPSite(runner, config.WEBHOOK_HOST, config.WEBHOOK_PORT).start()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with suppress(NotImplementedError):
+            loop.add_signal_handler(sig, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        await runner.cleanup()
 
 
 async def main():
     bot = Bot(token=TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
     await create_tables()
-    await dp.start_polling(bot)
+    if config.BOT_MODE == "webhook":
+        await run_webhook(bot)
+    else:
+        await dp.start_polling(bot)
 
 
 if __name__ == "__main__":
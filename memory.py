@@ -0,0 +1,102 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List
+
+import config
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+    "Сожми диалог пользователя с ботом для управления таблицами в краткое содержание на русском языке. "
+    "Сохрани названия и id таблиц и колонок, договорённости и незавершённые задачи. Не пересказывай "
+    "содержимое таблиц целиком. Не более 5 предложений."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 3 + 1
+
+
+def history_tokens(history: List[Dict]) -> int:
+    return sum(estimate_tokens(message.get("content") or "") for message in history)
+
+
+class MemoryManager:
+    def __init__(self, llm, model: str,
+                 get_context: Callable[[int], Awaitable[dict]],
+                 set_context: Callable[[int, dict], Awaitable[None]],
+                 budget: int = config.MEMORY_TOKEN_BUDGET,
+                 message_tokens: int = config.MEMORY_MESSAGE_TOKENS,
+                 summary_tokens: int = config.MEMORY_SUMMARY_TOKENS,
+                 pending_tokens: int = config.MEMORY_PENDING_TOKENS):
+        self.llm = llm
+        self.model = model
+        self.get_context = get_context
+        self.set_context = set_context
+        self.budget = budget
+        self.message_tokens = message_tokens
+        self.summary_tokens = summary_tokens
+        self.pending_tokens = pending_tokens
+        self._summarizing: Dict[int, asyncio.Task] = {}
+
+    def _shorten(self, content: str, tokens: int) -> str:
+        limit = tokens * 3
+        if len(content) <= limit:
+            return content
+        return content[:limit] + " …[сокращено]"
+
+    def add(self, context: dict, message: dict) -> dict:
+        history = list(context.get("history", []))
+        pending = list(context.get("pending", []))
+        history.append({**message, "content": self._shorten(message.get("content") or "", self.message_tokens)})
+        while len(history) > 2 and history_tokens(history) > self.budget:
+            pending.append(history.pop(0))
+        # Without a working summarizer pending would grow forever; the oldest messages are lost first.
+        while pending and history_tokens(pending) > self.pending_tokens:
+            pending.pop(0)
+        return {**context, "history": history, "pending": pending}
+
+    def prompt(self, context: dict) -> List[Dict]:
+        messages = []
+        if context.get("summary"):
+            messages.append({"role": "system", "content": "Краткое содержание предыдущего диалога: "
+                                                          + context["summary"]})
+        return messages + context.get("history", [])
+
+    def schedule_summary(self, user_id: int, context: dict):
+        if not context.get("pending") or user_id in self._summarizing:
+            return
+        task = asyncio.create_task(self._summarize(user_id))
+        self._summarizing[user_id] = task
+        task.add_done_callback(lambda _: self._summarizing.pop(user_id, None))
+
+    async def _summarize(self, user_id: int):
+        context = await self.get_context(user_id)
+        pending = context.get("pending", [])
+        if not pending:
+            return
+        dialog = "\n".join(f"{message['role']}: {message.get('content') or ''}" for message in pending)
+        if context.get("summary"):
+            dialog = f"Предыдущее краткое содержание: {context['summary']}\n\n{dialog}"
+        try:
+            response = await self.llm.chat(model=self.model, messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": dialog}
+            ])
+        except Exception:
+            logger.exception("summary of user %s context failed", user_id)
+            return
+        summary = response["message"]["content"].split("</think>")[-1].strip()
+
+        context = await self.get_context(user_id)
+        if context.get("pending", [])[:len(pending)] != pending:
+            return
+        await self.set_context(user_id, {
+            **context,
+            "summary": self._shorten(summary, self.summary_tokens),
+            "pending": context["pending"][len(pending):]
+        })
+
+    async def drain(self):
+        if self._summarizing:
+            await asyncio.gather(*self._summarizing.values(), return_exceptions=True)
@@ -0,0 +1,37 @@
+import logging
+
+import config
+from result_cache import normalize
+from tool_registry import READ_STEMS, ToolRegistry
+
+logger = logging.getLogger(__name__)
+
+WRITE_INTENTS = {"create", "update", "delete"}
+
+
+class ModelRouter:
+    def __init__(self, large: str = config.OLLAMA_MODEL, small: str = config.OLLAMA_SMALL_MODEL):
+        self.large = large
+        self.small = small or large
+        self.escalations = 0
+
+    def for_loop(self, query: str) -> str:
+        intents = set(ToolRegistry.intents(query))
+        if intents & WRITE_INTENTS or ToolRegistry.unmatched_verbs(query):
+            return self.large
+        if intents or any(stem in normalize(query) for stem in READ_STEMS):
+            return self.small
+        return self.large
+
+    @staticmethod
+    def valid(message, registry: ToolRegistry) -> bool:
+        calls = message.get("tool_calls") or []
+        return bool(calls) and all(
+            registry.get(call["function"]["name"]) is not None and isinstance(call["function"]["arguments"], dict)
+            for call in calls
+        )
+
+    def escalate(self, model: str) -> str:
+        self.escalations += 1
+        logger.info("escalating from %s to %s (%d escalations)", model, self.large, self.escalations)
+        return self.large
@@ -0,0 +1,150 @@
+import json
+import re
+from typing import Any, Dict, List
+
+from crud import CRUD
+from db_config import Tables, Columns, Data, async_session_maker
+from formatter import pager
+
+REFERENCE = re.compile(r"\$(\w+)\.(\w+)")
+
+PLAN_PROMPT = (
+    "Ты - помощник в управлении таблицами и базой данных. Составь ПОЛНЫЙ план выполнения задачи пользователя "
+    "одним ответом в формате JSON: { \"steps\": [ { \"id\": \"t1\", \"tool\": \"tables_create\", \"args\": { ... } }, "
+    "... ] }. Шаги выполняются по порядку в одной транзакции. Результат шага можно использовать в следующих шагах "
+    "через ссылку \"$<id шага>.<поле>\": после tables_create и columns_create доступно поле id, после rows_insert - "
+    "поля row_ids и first_row_id. Пример: создать таблицу Клиенты с колонкой Имя и двумя строками: "
+    "{ \"steps\": [ { \"id\": \"t1\", \"tool\": \"tables_create\", \"args\": { \"table_name\": \"Клиенты\" } }, "
+    "{ \"id\": \"c1\", \"tool\": \"columns_create\", \"args\": { \"table_id\": \"$t1.id\", \"column_name\": \"Имя\", "
+    "\"type\": \"TEXT\" } }, { \"id\": \"r1\", \"tool\": \"rows_insert\", \"args\": { \"table_id\": \"$t1.id\", "
+    "\"rows\": [ { \"Имя\": \"Влад\" }, { \"Имя\": \"Анна\" } ] } } ] }. Доступные инструменты и их аргументы:\n"
+    "tables_create(table_name), tables_update(record_id, table_name), tables_delete(record_id), "
+    "columns_create(table_id, column_name, type), columns_update(record_id, column_name, type), "
+    "columns_delete(record_id), rows_insert(table_id, rows), data_create(column_id, row_id, data), "
+    "data_update(record_id, column_id, data), data_delete(record_id, column_id), "
+    "table_read(table_id, columns, limit, offset), data_search(query, table_id), "
+    "data_aggregate(column_id, function, group_by_column_id).\n"
+    "Используй только id из списка таблиц пользователя или ссылки на предыдущие шаги. Если задачу невозможно "
+    "выполнить или она непонятна - верни { \"steps\": [] }."
+)
+
+
+class PlanError(Exception):
+    pass
+
+
+def parse_plan(content: str) -> List[Dict[str, Any]]:
+    try:
+        plan = json.loads(content)
+    except (TypeError, ValueError):
+        raise PlanError("Модель вернула план не в формате JSON.")
+    steps = plan.get("steps") if isinstance(plan, dict) else None
+    if not isinstance(steps, list) or not all(isinstance(step, dict) and "tool" in step for step in steps):
+        raise PlanError("План должен содержать список шагов steps с полем tool.")
+    return steps
+
+
+class PlanExecutor:
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def _resolve(self, value):
+        if isinstance(value, dict):
+            return {key: self._resolve(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._resolve(item) for item in value]
+        if not isinstance(value, str):
+            return value
+        whole = REFERENCE.fullmatch(value.strip())
+        if whole:
+            return self._lookup(whole.group(1), whole.group(2))
+        return REFERENCE.sub(lambda match: str(self._lookup(match.group(1), match.group(2))), value)
+
+    def _lookup(self, step_id: str, field: str):
+        if step_id not in self.results or field not in self.results[step_id]:
+            raise PlanError(f"Ссылка ${step_id}.{field} указывает на несуществующий результат.")
+        return self.results[step_id][field]
+
+    async def _run_step(self, crud: CRUD, tool: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        user_id = self.user_id
+        if tool == "tables_create":
+            result = await crud.create(Tables, {"table_name": args.get("table_name")}, user_id=user_id)
+        elif tool == "columns_create":
+            result = await crud.create(Columns, {
+                "table_id": args.get("table_id"), "column_name": args.get("column_name"), "type": args.get("type")
+            }, user_id=user_id)
+        elif tool == "rows_insert":
+            result = await crud.bulk_insert_rows(args.get("table_id"), args.get("rows") or [], user_id)
+            if isinstance(result, list):
+                return {"row_ids": result, "first_row_id": result[0] if result else None}
+        elif tool == "data_create":
+            result = await crud.create(Data, {
+                "column_id": args.get("column_id"), "row_id": args.get("row_id"), "data": args.get("data")
+            }, user_id=user_id)
+            if result.startswith("row_id:"):
+                return {"result": result}
+        elif tool in ("tables_update", "columns_update"):
+            model = Tables if tool == "tables_update" else Columns
+            fields = ("table_name",) if model == Tables else ("column_name", "type")
+            data = {field: args[field] for field in fields if args.get(field)}
+            result = await crud.update(model, args.get("record_id"), data, user_id=user_id) or "Не найдено"
+        elif tool == "data_update":
+            result = await crud.update(Data, args.get("record_id"), {"data": args.get("data")},
+                                       user_id=user_id, column_id=args.get("column_id")) or "Не найдено"
+        elif tool in ("tables_delete", "columns_delete"):
+            model = Tables if tool == "tables_delete" else Columns
+            result = await crud.delete(model, args.get("record_id"), user_id=user_id) or "Не найдено"
+        elif tool == "data_delete":
+            result = await crud.delete(Data, args.get("record_id"), user_id=user_id,
+                                       column_id=args.get("column_id")) or "Не найдено"
+        elif tool == "table_read":
+            result = await crud.read_table(args.get("table_id"), user_id, args.get("columns") or None,
+                                           limit=args.get("limit") or 50, offset=args.get("offset") or 0)
+            return {"result": result}
+        elif tool == "data_search":
+            return {"result": await crud.search(args.get("query") or "", user_id, table_id=args.get("table_id"))}
+        elif tool == "data_aggregate":
+            result = await crud.aggregate(args.get("column_id"), str(args.get("function") or "").lower(), user_id,
+                                          group_by_column_id=args.get("group_by_column_id"))
+            if isinstance(result, list):
+                return {"result": result}
+        else:
+            raise PlanError(f"Неизвестный инструмент '{tool}'.")
+
+        if isinstance(result, str):
+            raise PlanError(result)
+        if result is True:
+            return {"result": "Выполнено"}
+        return {"id": result}
+
+    @staticmethod
+    def _describe(result: Dict[str, Any]) -> str:
+        if isinstance(result.get("result"), list):
+            return pager.preview(result["result"])
+        if "row_ids" in result:
+            row_ids = result["row_ids"]
+            if not row_ids:
+                return "строки не переданы"
+            return f"добавлено строк: {len(row_ids)}, row_id с {row_ids[0]} по {row_ids[-1]}"
+        return ", ".join(f"{key}: {value}" for key, value in result.items())
+
+    async def execute(self, steps: List[Dict[str, Any]]) -> List[str]:
+        report = []
+        async with async_session_maker() as session:
+            crud = CRUD(session, autocommit=False)
+            try:
+                for number, step in enumerate(steps, start=1):
+                    step_id = str(step.get("id") or f"s{number}")
+                    tool = step["tool"]
+                    try:
+                        args = self._resolve(step.get("args") or {})
+                        self.results[step_id] = await self._run_step(crud, tool, args)
+                    except PlanError as e:
+                        raise PlanError(f"Шаг {number} ({tool}): {e} Все изменения плана отменены.")
+                    report.append(f"{step_id} {tool}: {self._describe(self.results[step_id])}")
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+        return report
@@ -0,0 +1,102 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().replace("ё", "е").split()).strip(" .!?")
+
+
+class DataVersions:
+    def __init__(self):
+        self.epoch = 0
+        self._versions: Dict[int, int] = {}
+
+    def get(self, user_id: int) -> Tuple[int, int]:
+        return self.epoch, self._versions.get(user_id, 0)
+
+    def bump(self, user_id: Optional[int]):
+        if user_id is None:
+            self.epoch += 1
+        else:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+
+data_versions = DataVersions()
+
+FOLLOW_UP_WORDS = {
+    "да", "нет", "ок", "ага", "еще", "его", "ее", "их", "им", "это", "этот", "эту", "эти", "этого", "там", "тоже",
+    "дальше", "снова", "также", "yes", "no", "ok", "it", "them", "this", "that", "more", "again",
+}
+FOLLOW_UP_STEMS = ("следующ", "предыдущ", "тот же", "та же", "то же", "те же")
+
+
+def self_contained(query: str) -> bool:
+    text = normalize(query)
+    words = text.replace(",", " ").split()
+    return len(words) >= 3 and not FOLLOW_UP_WORDS.intersection(words) and not any(
+        stem in text for stem in FOLLOW_UP_STEMS
+    )
+
+
+def conversation_tag(context: Optional[dict]) -> int:
+    """Identifies the exchange a follow-up refers to: the last assistant turn, or the summary without one."""
+    context = context or {}
+    for message in reversed(context.get("history", [])):
+        if message.get("role") == "assistant":
+            return hash(message.get("content") or "")
+    return hash(context.get("summary") or "")
+
+
+class ResultCache:
+    def __init__(self, max_entries: int = config.RESULT_CACHE_SIZE, ttl: float = config.RESULT_CACHE_TTL,
+                 max_bytes: int = config.RESULT_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[Hashable, Tuple[str, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query: str, user_id: int, context: Optional[dict] = None) -> Hashable:
+        conversation = None if self_contained(query) else conversation_tag(context)
+        return user_id, data_versions.get(user_id), normalize(query), conversation
+
+    def get(self, key: Hashable) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[1] > self.ttl:
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        logger.info("result cache hit for user %s, hit rate %.0f%%", key[0], self.hit_rate * 100)
+        return entry[0]
+
+    def set(self, key: Hashable, answer: str):
+        size = len(answer.encode())
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (answer, time.monotonic())
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: Hashable):
+        answer, _ = self._entries.pop(key)
+        self.bytes -= len(answer.encode())
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
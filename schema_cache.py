@@ -0,0 +1,50 @@
+import logging
+from typing import Dict, List
+
+from crud import CRUD
+from db_config import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaCache:
+    def __init__(self, max_tables: int = 50):
+        self.max_tables = max_tables
+        self._catalogs: Dict[int, List[Dict]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: int) -> List[Dict]:
+        catalog = self._catalogs.get(user_id)
+        if catalog is not None:
+            self.hits += 1
+            return catalog
+        self.misses += 1
+        async with async_session_maker() as session:
+            crud = CRUD(session)
+            catalog = await crud.schema(user_id)
+        self._catalogs[user_id] = catalog
+        return catalog
+
+    def invalidate(self, user_id: int):
+        self._catalogs.pop(user_id, None)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def log_stats(self):
+        logger.info("schema cache: hits=%d misses=%d hit rate=%.0f%%", self.hits, self.misses, self.hit_rate * 100)
+
+    async def describe(self, user_id: int) -> str:
+        catalog = await self.get(user_id)
+        if not catalog:
+            return "У пользователя пока нет таблиц."
+        lines = ["Текущие таблицы пользователя (id таблиц и колонок можно использовать сразу):"]
+        for table in catalog[:self.max_tables]:
+            columns = ", ".join(f"{c['column_name']}[id={c['id']}, {c['type']}]" for c in table["columns"])
+            lines.append(f"- {table['table_name']}[id={table['id']}]: {columns or 'нет колонок'}")
+        if len(catalog) > self.max_tables:
+            lines.append(f"... и ещё {len(catalog) - self.max_tables} таблиц, используй list_records.")
+        return "\n".join(lines)
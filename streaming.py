@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import Message
+
+import config
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_LIMIT = 4096
+
+
+class ThinkFilter:
+    open_tag = "<think>"
+    close_tag = "</think>"
+
+    def __init__(self):
+        self.text = ""
+        self._buffer = ""
+        self._thinking = False
+
+    def feed(self, chunk: str) -> str:
+        self._buffer += chunk
+        while self._buffer:
+            tag = self.close_tag if self._thinking else self.open_tag
+            index = self._buffer.find(tag)
+            if index >= 0:
+                if not self._thinking:
+                    self.text += self._buffer[:index]
+                self._buffer = self._buffer[index + len(tag):]
+                self._thinking = not self._thinking
+                continue
+            keep = self._partial_tag(tag)
+            if not self._thinking:
+                self.text += self._buffer[:len(self._buffer) - keep]
+            self._buffer = self._buffer[len(self._buffer) - keep:]
+            break
+        return self.text
+
+    def _partial_tag(self, tag: str) -> int:
+        for size in range(min(len(tag) - 1, len(self._buffer)), 0, -1):
+            if self._buffer.endswith(tag[:size]):
+                return size
+        return 0
+
+    def close(self) -> str:
+        if not self._thinking:
+            self.text += self._buffer
+        self._buffer = ""
+        return self.text.strip()
+
+
+def strip_think(text: str) -> str:
+    think = ThinkFilter()
+    think.feed(text)
+    return think.close()
+
+
+class FirstTokenStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.worst = max(self.worst, seconds)
+        logger.info("time to first visible token: %.0f ms (avg %.0f ms over %d replies)",
+                    seconds * 1000, self.average * 1000, self.count)
+
+    @property
+    def average(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+first_token = FirstTokenStats()
+
+
+def split_message(text: str, limit: int = MESSAGE_LIMIT) -> List[str]:
+    return [text[i:i + limit] for i in range(0, len(text), limit)] or [""]
+
+
+class ReplyStreamer:
+    def __init__(self, message: Message, interval: float = config.STREAM_EDIT_INTERVAL):
+        self.message = message
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.sent: Optional[Message] = None
+        self.shown = ""
+        self.edits = 0
+        self._latest = ""
+        self._last_edit = 0.0
+        self._pending: Optional[asyncio.Task] = None
+
+    async def update(self, text: str):
+        self._latest = text.strip()[:MESSAGE_LIMIT]
+        if not self._latest or (self._pending and not self._pending.done()):
+            return
+        if self.sent is None or time.perf_counter() - self._last_edit >= self.interval:
+            self._pending = asyncio.create_task(self._show(self._latest))
+
+    async def _show(self, text: str, parse_mode=None):
+        if text == self.shown and parse_mode is None:
+            return
+        self._last_edit = time.perf_counter()
+        try:
+            if self.sent is None:
+                self.sent = await self.message.reply(text, parse_mode=parse_mode)
+                first_token.add(time.perf_counter() - self.started)
+            else:
+                await self.sent.edit_text(text, parse_mode=parse_mode)
+                self.edits += 1
+            self.shown = text
+        except TelegramBadRequest as e:
+            logger.debug("stream update skipped: %s", e)
+
+    async def finish(self, text: str):
+        if self._pending:
+            await asyncio.gather(self._pending, return_exceptions=True)
+        first, *rest = split_message(text.strip() or "Пустой ответ.")
+        if self.sent is None:
+            self.sent = await self._reply(self.message, first)
+            first_token.add(time.perf_counter() - self.started)
+        else:
+            try:
+                await self.sent.edit_text(first)
+            except TelegramBadRequest:
+                if first != self.shown:
+                    await self.sent.edit_text(first, parse_mode=None)
+        for part in rest:
+            await self._reply(self.message, part)
+
+    @staticmethod
+    async def _reply(message: Message, text: str) -> Message:
+        try:
+            return await message.reply(text)
+        except TelegramBadRequest:
+            return await message.reply(text, parse_mode=None)
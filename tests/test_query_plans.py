@@ -0,0 +1,28 @@
+import asyncio
+
+from benchmarks.query_plans import baseline, plans
+from db_config import Migration, make_engine
+
+
+async def _plans_around_migration(path):
+    engine = make_engine(f"sqlite+aiosqlite:///{path}")
+    try:
+        await baseline(engine, cells=20_000, other_users=20)
+        async with engine.connect() as conn:
+            before = await plans(conn)
+        await Migration.up(engine)
+        async with engine.connect() as conn:
+            after = await plans(conn)
+    finally:
+        await engine.dispose()
+    return before, after
+
+
+def test_migration_removes_full_scans(tmp_path):
+    before, after = asyncio.run(_plans_around_migration(tmp_path / "plans.db"))
+
+    # The baseline schema really lacks the index, otherwise the check below proves nothing.
+    assert "SCAN data" in before["cells of column"], before["cells of column"]
+    for name, plan in after.items():
+        assert not any(f"SCAN {table}" in plan for table in ("data", "columns", "tables")), (name, plan)
+    assert "ix_data_column_row_data" in after["cells of column"], after["cells of column"]
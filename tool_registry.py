@@ -0,0 +1,95 @@
+import json
+import re
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional
+
+from memory import estimate_tokens
+from result_cache import normalize
+
+Handler = Callable[[Dict[str, Any], int], Awaitable[Any]]
+
+BASE_TOOLS = {"task_end", "table_read", "next_page"}
+INTENT_STEMS = {
+    "create": ("созд", "добав", "внес", "заполн", "запиш", "нов", "вставь", "create", "add", "insert", "new"),
+    "update": ("измен", "обнов", "замен", "переимен", "исправ", "поменя", "update", "rename", "change", "edit"),
+    "delete": ("удал", "очист", "убер", "сотри", "delete", "remove", "drop", "clear"),
+    "search": ("найд", "найти", "поиск", "ищ", "где", "фильтр", "search", "find", "where", "filter"),
+    "aggregate": ("сколько", "сумм", "средн", "максим", "миним", "посчит", "количеств", "итог", "count", "sum",
+                  "average", "avg", "max", "min", "total"),
+}
+READ_STEMS = ("покажи", "выведи", "какие", "какой", "какая", "список", "прочитай", "открой", "show", "list",
+              "what", "which")
+# Commands the intent stems do not cover. Russian nouns and past tenses often end like imperatives
+# ("имени", "были", "люди", "записей"), so -и/-ь/-й forms count only when listed here; -уй is unambiguous.
+IMPERATIVE_VERBS = frozenset({
+    "поставь", "проставь", "выставь", "установи", "задай", "присвой", "назначь", "укажи", "впиши", "отметь",
+    "перенеси", "перемести", "помести", "скопируй", "сохрани", "верни", "отправь", "дополни", "сделай",
+    "объедини", "раздели", "свяжи", "сложи", "умножь", "вычти", "вычисли", "округли", "переведи", "сгруппируй",
+    "отсортируй", "упорядочи", "пронумеруй", "продублируй", "set", "move", "copy", "sort", "merge",
+})
+IMPERATIVE = re.compile(r"^[а-я]{3,}уй(?:те)?$")
+INTENT_TOOLS = {
+    "create": {"tables_create", "columns_create", "data_create", "rows_insert"},
+    "update": {"tables_update", "columns_update", "data_update", "list_records_with_filters", "data_get"},
+    "delete": {"tables_delete", "columns_delete", "data_delete", "list_records_with_filters", "data_get"},
+    "search": {"data_search", "list_records_with_filters"},
+    "aggregate": {"data_aggregate"},
+}
+
+
+class Tool:
+    def __init__(self, schema: Dict, handler: Handler, final: bool = False):
+        self.schema = schema
+        self.name = schema["function"]["name"]
+        self.handler = handler
+        self.final = final
+        self.tokens = estimate_tokens(json.dumps(schema, ensure_ascii=False))
+
+
+class ToolRegistry:
+    def __init__(self):
+        self._tools: Dict[str, Tool] = {}
+        self._subsets: Dict[FrozenSet[str], List[Dict]] = {}
+
+    def register(self, schema: Dict, handler: Handler, final: bool = False):
+        tool = Tool(schema, handler, final)
+        self._tools[tool.name] = tool
+        self._subsets.clear()
+
+    def get(self, name: str) -> Optional[Tool]:
+        return self._tools.get(name)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._tools)
+
+    @staticmethod
+    def intents(query: str) -> List[str]:
+        text = normalize(query)
+        return [intent for intent, stems in INTENT_STEMS.items() if any(stem in text for stem in stems)]
+
+    @staticmethod
+    def unmatched_verbs(query: str) -> List[str]:
+        known = READ_STEMS + tuple(stem for stems in INTENT_STEMS.values() for stem in stems)
+        verbs = []
+        for word in re.findall(r"\w+", normalize(query)):
+            listed = word in IMPERATIVE_VERBS or word.endswith("те") and word[:-2] in IMPERATIVE_VERBS
+            if (listed or IMPERATIVE.match(word)) and not any(stem in word for stem in known):
+                verbs.append(word)
+        return verbs
+
+    def select(self, query: str, full: bool = False) -> List[Dict]:
+        intents = self.intents(query)
+        if full or not intents or self.unmatched_verbs(query):
+            return self.schemas(self._tools)
+        return self.schemas(set(BASE_TOOLS).union(*(INTENT_TOOLS[intent] for intent in intents)))
+
+    def schemas(self, names: Iterable[str]) -> List[Dict]:
+        key = frozenset(name for name in names if name in self._tools)
+        subset = self._subsets.get(key)
+        if subset is None:
+            subset = [tool.schema for name, tool in self._tools.items() if name in key]
+            self._subsets[key] = subset
+        return subset
+
+    def tokens(self, schemas: List[Dict]) -> int:
+        return sum(self._tools[schema["function"]["name"]].tokens for schema in schemas)
@@ -0,0 +1,48 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class UserQueue:
+    def __init__(self, process: Callable[[int, List[Any]], Awaitable[None]],
+                 max_depth: int = config.USER_QUEUE_DEPTH):
+        self.process = process
+        self.max_depth = max_depth
+        self._pending: Dict[int, List[Any]] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self.turns = 0
+        self.merged = 0
+        self.rejected = 0
+
+    def submit(self, user_id: int, item: Any) -> bool:
+        if user_id not in self._workers:
+            self._pending[user_id] = [item]
+            self._workers[user_id] = asyncio.create_task(self._work(user_id))
+            return True
+        pending = self._pending.setdefault(user_id, [])
+        if len(pending) >= self.max_depth:
+            self.rejected += 1
+            return False
+        pending.append(item)
+        return True
+
+    async def _work(self, user_id: int):
+        try:
+            while self._pending.get(user_id):
+                batch = self._pending.pop(user_id)
+                self.turns += 1
+                self.merged += len(batch) - 1
+                try:
+                    await self.process(user_id, batch)
+                except Exception:
+                    logger.exception("turn of user %s failed", user_id)
+        finally:
+            self._workers.pop(user_id, None)
+
+    async def drain(self):
+        while self._workers:
+            await asyncio.gather(*self._workers.values(), return_exceptions=True)